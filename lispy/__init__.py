@@ -2,3 +2,7 @@ __version__ = "0.5"
 
 from .interpreter import Lispy  # noqa
 from .env import ExecutionLimit  # noqa
+from .parallel import WorkerPool  # noqa
+from .output import OutputSink  # noqa
+from .printer import PrintLimits  # noqa
+from .mal_types import calling_convention  # noqa
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+from collections import OrderedDict
+import threading
+import time
+
+
+LRU = "lru"
+LFU = "lfu"
+POLICIES = (LRU, LFU)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    evictions: int
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "frequency")
+
+    def __init__(self, value: Any, expires: Optional[float]):
+        self.value = value
+        self.expires = expires
+        self.frequency = 1
+
+
+class Cache:
+    """Thread-safe bounded cache with LRU or LFU eviction and optional TTL.
+
+    max_size of None means unbounded, ttl is in seconds.
+    Both get and put are O(1) for either policy."""
+
+    MISSING = object()
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        policy: str = LRU,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown cache policy {policy!r}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Ordered by recency for LRU, insertion order otherwise
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # LFU frequency buckets, each ordered oldest first
+        self._frequencies: Dict[int, OrderedDict[Hashable, None]] = {}
+        self._min_frequency = 0
+        # With a fixed ttl, expiry order is the order entries were last put
+        self._expiry_order: OrderedDict[Hashable, None] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None:
+                if entry.expires <= self._clock():
+                    self._remove(key, entry)
+                    entry = None
+            if entry is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._touch(key, entry)
+            return entry.value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            expires = None
+            if self.ttl is not None:
+                now = self._clock()
+                expires = now + self.ttl
+                self._purge_expired(now)
+                self._expiry_order[key] = None
+                self._expiry_order.move_to_end(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.value = value
+                entry.expires = expires
+                self._touch(key, entry)
+                return
+            # A loop, so lowering max_size takes effect on the next put
+            while self.max_size is not None and len(self._entries) >= self.max_size:
+                self._evict()
+            entry = _Entry(value, expires)
+            self._entries[key] = entry
+            if self.policy == LFU:
+                self._frequencies.setdefault(1, OrderedDict())[key] = None
+                self._min_frequency = 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._frequencies.clear()
+            self._expiry_order.clear()
+            self._min_frequency = 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: Optional[int]) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be positive")
+        self._max_size = max_size
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, len(self._entries), self._evictions)
+
+    def _touch(self, key: Hashable, entry: _Entry) -> None:
+        if self.policy == LRU:
+            self._entries.move_to_end(key)
+            return
+        bucket = self._frequencies[entry.frequency]
+        del bucket[key]
+        if not bucket:
+            del self._frequencies[entry.frequency]
+            if self._min_frequency == entry.frequency:
+                self._min_frequency += 1
+        entry.frequency += 1
+        self._frequencies.setdefault(entry.frequency, OrderedDict())[key] = None
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry_order:
+            key = next(iter(self._expiry_order))
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires is None or entry.expires > now:
+                    return
+                self._remove(key, entry)
+            else:
+                del self._expiry_order[key]
+
+    def _remove(self, key: Hashable, entry: _Entry) -> None:
+        del self._entries[key]
+        self._expiry_order.pop(key, None)
+        if self.policy == LFU:
+            bucket = self._frequencies[entry.frequency]
+            del bucket[key]
+            if not bucket:
+                del self._frequencies[entry.frequency]
+
+    def _evict(self) -> None:
+        if self.policy == LRU:
+            key = next(iter(self._entries))
+        else:
+            if self._min_frequency not in self._frequencies:
+                self._min_frequency = min(self._frequencies)
+            key = next(iter(self._frequencies[self._min_frequency]))
+        self._remove(key, self._entries[key])
+        self._evictions += 1
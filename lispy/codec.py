@@ -0,0 +1,224 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple, Union
+import itertools
+import struct
+
+from .mal_types import (
+    MalExpression,
+    MalBoolean,
+    MalBytes,
+    MalFloat,
+    MalHash_map,
+    MalInt,
+    MalKeyword,
+    MalList,
+    MalNil,
+    MalString,
+    MalSymbol,
+    MalVector,
+    MalInvalidArgumentException,
+    MalSyntaxException,
+)
+
+if TYPE_CHECKING:
+    from .mal_types import HashMapDict
+
+VERSION = 1
+
+NIL = 0
+FALSE = 1
+TRUE = 2
+INT = 3
+FLOAT = 4
+STRING = 5
+KEYWORD = 6
+SYMBOL = 7
+REF = 8
+LIST = 9
+VECTOR = 10
+MAP = 11
+BYTES = 12
+
+_DOUBLE = struct.Struct(">d")
+_NAMED = {MalString: STRING, MalKeyword: KEYWORD, MalSymbol: SYMBOL}
+_COLLECTIONS = {MalList: LIST, MalVector: VECTOR}
+# Tags followed by an unsigned varint
+_VARINT_TAGS = frozenset((INT, STRING, KEYWORD, SYMBOL, REF, LIST, VECTOR, MAP, BYTES))
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _write_uint(out: bytearray, n: int) -> None:
+    # LEB128, so small counts and lengths take a single byte
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def encode(value: MalExpression) -> bytes:
+    """Encode a Mal value in a compact binary form.
+
+    Each value is a tag byte followed by its data. Integers are zigzag
+    varints, floats 8 byte doubles, strings length prefixed UTF-8
+    and bytes length prefixed.
+    A string, keyword or symbol seen before is written as a reference
+    to its first occurrence. Collections are written as a count followed
+    by their elements, without recursion."""
+    out = bytearray([VERSION])
+    refs: Dict[Tuple[int, str], int] = {}
+    stack: List[Iterator[MalExpression]] = [iter((value,))]
+    while stack:
+        x = next(stack[-1], None)
+        if x is None:
+            stack.pop()
+            continue
+        cls = MalString if isinstance(x, MalString) else type(x)
+        if cls in _NAMED:
+            # Including string views
+            key = (_NAMED[cls], x.native())
+            index = refs.get(key)
+            if index is not None:
+                out.append(REF)
+                _write_uint(out, index)
+            else:
+                refs[key] = len(refs)
+                data = key[1].encode("utf-8")
+                out.append(key[0])
+                _write_uint(out, len(data))
+                out += data
+        elif cls is MalInt:
+            n = x.native()
+            out.append(INT)
+            _write_uint(out, n * 2 if n >= 0 else -n * 2 - 1)
+        elif cls in _COLLECTIONS or isinstance(x, MalList):
+            # Including lazy seqs, which are read in full
+            items = x.native()
+            out.append(_COLLECTIONS.get(cls, LIST))
+            _write_uint(out, len(items))
+            stack.append(iter(items))
+        elif isinstance(x, MalHash_map):
+            entries = x.native()
+            out.append(MAP)
+            _write_uint(out, len(entries))
+            stack.append(itertools.chain.from_iterable(entries.items()))
+        elif isinstance(x, MalNil):
+            out.append(NIL)
+        elif isinstance(x, MalBoolean):
+            out.append(TRUE if x.native() else FALSE)
+        elif isinstance(x, MalFloat):
+            out.append(FLOAT)
+            out += _DOUBLE.pack(x.native())
+        elif isinstance(x, MalBytes):
+            data = x.native()
+            out.append(BYTES)
+            _write_uint(out, len(data))
+            out += data
+        else:
+            raise MalInvalidArgumentException(x, "cannot be encoded")
+    return bytes(out)
+
+
+def decode(data: Buffer) -> MalExpression:
+    """Decode a value written by encode.
+
+    Strings are decoded straight from the buffer, without copying it."""
+    view = memoryview(data).cast("B")
+    if not view or view[0] != VERSION:
+        raise MalSyntaxException("unsupported encoded data version")
+    try:
+        value, pos = _decode(view)
+    except (IndexError, struct.error):
+        raise MalSyntaxException("truncated encoded data") from None
+    except UnicodeDecodeError:
+        raise MalSyntaxException("invalid encoded string") from None
+    if pos != len(view):
+        raise MalSyntaxException("trailing encoded data")
+    return value
+
+
+def _decode(view: memoryview) -> Tuple[MalExpression, int]:
+    pos = 1
+    refs: List[MalExpression] = []
+    # Each frame is [tag, remaining values, values]
+    stack: List[list] = []
+    while True:
+        tag = view[pos]
+        pos += 1
+        if tag in _VARINT_TAGS:
+            n = shift = 0
+            while True:
+                b = view[pos]
+                pos += 1
+                n |= (b & 0x7F) << shift
+                if b < 0x80:
+                    break
+                shift += 7
+        value: MalExpression
+        if tag == STRING or tag == KEYWORD or tag == SYMBOL:
+            end = pos + n
+            if end > len(view):
+                raise IndexError(end)
+            s = str(view[pos:end], "utf-8")
+            pos = end
+            if tag == STRING:
+                value = MalString(s)
+            elif tag == KEYWORD:
+                value = MalKeyword(s)
+            else:
+                value = MalSymbol(s)
+            refs.append(value)
+        elif tag == BYTES:
+            end = pos + n
+            if end > len(view):
+                raise IndexError(end)
+            # Shares the buffer unless it is writable
+            value = MalBytes(view[pos:end])
+            pos = end
+        elif tag == REF:
+            if n >= len(refs):
+                raise MalSyntaxException("invalid encoded reference")
+            value = refs[n]
+        elif tag == LIST or tag == VECTOR or tag == MAP:
+            count = n * 2 if tag == MAP else n
+            if count:
+                stack.append([tag, count, []])
+                continue
+            value = _collection(tag, [])
+        elif tag == INT:
+            value = MalInt(n >> 1 if not n & 1 else -((n + 1) >> 1))
+        elif tag == FLOAT:
+            value = MalFloat(_DOUBLE.unpack_from(view, pos)[0])
+            pos += _DOUBLE.size
+        elif tag == NIL:
+            value = MalNil()
+        elif tag == FALSE or tag == TRUE:
+            value = MalBoolean(tag == TRUE)
+        else:
+            raise MalSyntaxException(f"invalid encoded tag {tag}")
+
+        # Add the value to its collection, completing collections
+        while stack:
+            frame = stack[-1]
+            frame[2].append(value)
+            frame[1] -= 1
+            if frame[1]:
+                break
+            stack.pop()
+            value = _collection(frame[0], frame[2])
+        else:
+            return value, pos
+
+
+def _collection(tag: int, items: List[MalExpression]) -> MalExpression:
+    if tag == LIST:
+        return MalList(items)
+    if tag == VECTOR:
+        return MalVector(items)
+    hashmap: HashMapDict = {}
+    for i in range(0, len(items), 2):
+        key = items[i]
+        if not isinstance(key, (MalString, MalKeyword)):
+            raise MalSyntaxException("hash-map key not string or keyword")
+        hashmap[key] = items[i + 1]
+    return MalHash_map(hashmap)
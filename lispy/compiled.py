@@ -0,0 +1,179 @@
+from __future__ import annotations
+from typing import Any, List, Optional, Sequence, cast
+from pathlib import Path
+import hashlib
+import marshal
+import os
+
+from .mal_types import (
+    MalExpression,
+    MalBoolean,
+    MalFloat,
+    MalHash_map,
+    MalInt,
+    MalKeyword,
+    MalList,
+    MalMeta,
+    MalNil,
+    MalString,
+    MalSymbol,
+    MalVector,
+    SourceMap,
+)
+
+MAGIC = b"MALC"
+VERSION = 1
+CACHE_DIR = "__malcache__"
+
+# Tags for encoded forms that are not plain marshal values
+_STRING, _KEYWORD, _LIST, _VECTOR, _MAP = range(5)
+
+
+def cache_path(path: Path) -> Path:
+    """Where the compiled forms of a source file are kept, like __pycache__."""
+    return path.parent / CACHE_DIR / (path.name + "c")
+
+
+def file_digest(path: Path) -> bytes:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _offset(form: MalMeta) -> int:
+    return -1 if form._source_map is None else form._source_offset
+
+
+def encode(form: MalExpression) -> Any:
+    """Encode a read form as nested marshal values.
+
+    Symbols, numbers, booleans and nil are stored as the native value,
+    other forms as tuples starting with a tag."""
+    if isinstance(form, MalSymbol):
+        return form.native()
+    if isinstance(form, (MalInt, MalFloat, MalBoolean)):
+        return form.native()
+    if isinstance(form, MalNil):
+        return None
+    if isinstance(form, MalString):
+        return (_STRING, form.native())
+    if isinstance(form, MalKeyword):
+        return (_KEYWORD, form.native())
+    if isinstance(form, MalList):
+        return (_LIST, tuple(encode(x) for x in form.native()), _offset(form))
+    if isinstance(form, MalVector):
+        return (_VECTOR, tuple(encode(x) for x in form.native()), _offset(form))
+    if isinstance(form, MalHash_map):
+        items = tuple(encode(x) for kv in form.native().items() for x in kv)
+        return (_MAP, items, _offset(form))
+    raise ValueError(f"cannot compile {form.readable_str()}")
+
+
+def decode(value: Any, source_map: Optional[SourceMap]) -> MalExpression:
+    t = type(value)
+    if t is str:
+        return MalSymbol(value)
+    if t is bool:
+        return MalBoolean(value)
+    if t is int:
+        return MalInt(value)
+    if t is float:
+        return MalFloat(value)
+    if value is None:
+        return MalNil()
+    tag = value[0]
+    if tag == _STRING:
+        return MalString(value[1])
+    if tag == _KEYWORD:
+        return MalKeyword(value[1])
+    items = [decode(x, source_map) for x in value[1]]
+    form: MalExpression
+    if tag == _LIST:
+        form = MalList(items)
+    elif tag == _VECTOR:
+        form = MalVector(items)
+    else:
+        form = MalHash_map(dict(zip(items[::2], items[1::2])))
+    if source_map is not None and value[2] >= 0:
+        meta = cast(MalMeta, form)
+        meta._source_map = source_map
+        meta._source_offset = value[2]
+    return form
+
+
+def load(
+    path: Path, st: os.stat_result, source: Optional[str] = None, refresh: bool = True
+) -> Optional[List[MalExpression]]:
+    """Return the compiled forms for path, or None if missing or out of date.
+
+    Compiled forms are current if the source mtime and size match,
+    or if only the mtime differs but the contents hash the same.
+    In that case the stored mtime is updated when refresh is true,
+    so the contents are not hashed again on the next load."""
+    try:
+        data = cache_path(path).read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(MAGIC):
+        return None
+    start = len(MAGIC)
+    try:
+        header, line_starts, encoded = marshal.loads(data[start:])
+        version, mtime_ns, size, digest = header
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != VERSION or size != st.st_size:
+        return None
+    if mtime_ns != st.st_mtime_ns:
+        try:
+            if file_digest(path) != digest:
+                return None
+        except OSError:
+            return None
+    source_map = SourceMap(str(path) if source is None else source, None, line_starts)
+    try:
+        forms = [decode(x, source_map) for x in encoded]
+    except (IndexError, TypeError, ValueError, RecursionError):
+        return None
+    if refresh and mtime_ns != st.st_mtime_ns:
+        header = (version, st.st_mtime_ns, size, digest)
+        _write(cache_path(path), marshal.dumps((header, line_starts, encoded)))
+    return forms
+
+
+def dump(
+    path: Path,
+    st: os.stat_result,
+    digest: bytes,
+    forms: Sequence[MalExpression],
+    line_starts: Optional[List[int]] = None,
+) -> bool:
+    """Write compiled forms for path, returns False if they could not be written.
+
+    The file is written under a temporary name and renamed,
+    so concurrent readers never see a partial file."""
+    target = cache_path(path)
+    header = (VERSION, st.st_mtime_ns, st.st_size, digest)
+    try:
+        data = marshal.dumps((header, line_starts or [0], [encode(f) for f in forms]))
+    except (ValueError, RecursionError):
+        # Forms nested too deeply for marshal, or not produced by the reader
+        return False
+    return _write(target, data)
+
+
+def _write(target: Path, data: bytes) -> bool:
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        target.parent.mkdir(exist_ok=True)
+        tmp.write_bytes(MAGIC + data)
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+    return True
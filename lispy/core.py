@@ -1,10 +1,36 @@
 from __future__ import annotations
+import base64
+import binascii
+import io
 import time
 import operator
-from typing import List, Union, NoReturn, Optional, Callable, Any, cast, TYPE_CHECKING
+import functools
+import itertools
+import locale
+import mmap
+import os
+import re
+from typing import (
+    Dict,
+    List,
+    Union,
+    NoReturn,
+    Optional,
+    Callable,
+    Any,
+    Iterable,
+    Iterator,
+    Match,
+    cast,
+    TYPE_CHECKING,
+)
 
+from . import codec
 from . import reader
+from . import printer
+from .cache import Cache, POLICIES
 from .mal_types import (
+    AccessPolicy,
     MalFloat,
     MalInt,
     MalNil,
@@ -13,11 +39,18 @@ from .mal_types import (
     MalExpression,
     MalFunction,
     MalFunctionCompiled,
+    MalFunctionMemoized,
     MalPythonObject,
     MalAtom,
     MalHash_map,
     MalVector,
     MalMeta,
+    MalPattern,
+    MalLazySeq,
+    MalBytes,
+    MalMappingView,
+    MalSequenceView,
+    MalStringView,
 )
 from .mal_types import (
     MalInvalidArgumentException,
@@ -28,6 +61,7 @@ from .mal_types import (
     MalNotImplementedException,
     MalIndexError,
     MalSyntaxException,
+    hash_key,
 )
 
 if TYPE_CHECKING:
@@ -55,20 +89,41 @@ def div(a: Any, b: Any) -> Union[int, float]:
         return operator.floordiv(a, b)
 
 
-def prn(args: List[MalExpression]) -> MalNil:
-    result_string = " ".join(map(lambda x: x.readable_str(), args))
-    python_print(result_string)
+def prn(
+    args: List[MalExpression], emit: Optional[Callable[[str], None]] = None
+) -> MalNil:
+    result_string = " ".join(map(printer.pr_str, args))
+    (python_print if emit is None else emit)(result_string)
     return MalNil()
 
 
 def pr_str(args: List[MalExpression]) -> MalString:
-    result_string = " ".join(map(lambda x: x.readable_str(), args))
+    result_string = " ".join(map(printer.pr_str, args))
     return MalString(result_string)
 
 
-def println(args: List[MalExpression]) -> MalNil:
-    result_string = " ".join(map(lambda x: x.unreadable_str(), args))
-    python_print(result_string)
+def println(
+    args: List[MalExpression], emit: Optional[Callable[[str], None]] = None
+) -> MalNil:
+    result_string = " ".join(printer.pr_str(x, readably=False) for x in args)
+    (python_print if emit is None else emit)(result_string)
+    return MalNil()
+
+
+def pprint(
+    args: List[MalExpression], emit: Optional[Callable[[str], None]] = None
+) -> MalNil:
+    if not args:
+        raise MalSyntaxException("pprint requires a value")
+    options = keyword_args(args[1:], ("width", "depth"))
+    width = options.get("width", MalInt(printer.DEFAULT_WIDTH))
+    if not isinstance(width, MalInt) or width.native() < 1:
+        raise MalInvalidArgumentException(width, "not a positive int")
+    depth = options.get("depth", MalNil())
+    if not isinstance(depth, (MalInt, MalNil)):
+        raise MalInvalidArgumentException(depth, "not an int")
+    stream = printer.LineWriter(python_print if emit is None else emit)
+    printer.pprint(args[0], stream, width.native(), depth.native())
     return MalNil()
 
 
@@ -79,13 +134,21 @@ def list_q(x: MalExpression) -> MalBoolean:
 
 
 def empty_q(x: MalExpression) -> MalBoolean:
+    if isinstance(x, MalLazySeq):
+        return MalBoolean(x.empty())
+    if isinstance(x, MalSequenceView):
+        return MalBoolean(x.count() == 0)
+    if isinstance(x, MalBytes):
+        return MalBoolean(len(x.native()) == 0)
     if sequential_q(x).native():
         return MalBoolean(len(x.native()) == 0)
     raise MalInvalidArgumentException(x, "not a list")
 
 
 def count(x: MalExpression) -> MalInt:
-    if isinstance(x, MalList) or isinstance(x, MalVector):
+    if isinstance(x, (MalSequenceView, MalMappingView)):
+        return MalInt(x.count())
+    if isinstance(x, (MalList, MalVector, MalHash_map, MalBytes)):
         return MalInt(len(x.native()))
     elif isinstance(x, MalNil):
         return MalInt(0)
@@ -119,19 +182,176 @@ def read_string(a: MalExpression) -> MalExpression:
     raise MalInvalidArgumentException(a, "not a string")
 
 
-def slurp(filename: MalExpression) -> MalString:
-    if not isinstance(filename, MalString):
-        raise MalInvalidArgumentException(filename, "not a string")
-    with open(filename.native(), "r") as the_file:
-        contents = the_file.read()
-    return MalString(contents)
+def encode(value: MalExpression) -> MalExpression:
+    return MalBytes(codec.encode(value))
+
+
+def decode(data: MalExpression) -> MalExpression:
+    if isinstance(data, MalPythonObject) and isinstance(
+        data.native(), (bytes, bytearray, memoryview)
+    ):
+        return codec.decode(data.native())
+    return codec.decode(_bytes(data))
+
+
+def _bytes(b: MalExpression) -> memoryview:
+    if not isinstance(b, MalBytes):
+        raise MalInvalidArgumentException(b, "not bytes")
+    return b.native()
+
+
+def bytes_(coll: MalExpression) -> MalBytes:
+    if isinstance(coll, MalBytes):
+        return coll
+    values: List[int] = []
+    for x in iterate_items(coll):
+        if not isinstance(x, MalInt) or not 0 <= x.native() <= 255:
+            raise MalInvalidArgumentException(x, "not a byte")
+        values.append(x.native())
+    return MalBytes(bytes(values))
+
+
+def _charset(args: List[MalExpression]) -> str:
+    return _string(args[1]) if len(args) == 2 else "utf-8"
+
+
+def string_to_bytes(args: List[MalExpression]) -> MalBytes:
+    if len(args) not in (1, 2):
+        raise MalSyntaxException("string->bytes requires a string and optional charset")
+    try:
+        return MalBytes(_string(args[0]).encode(_charset(args)))
+    except (LookupError, UnicodeError) as e:
+        raise MalInvalidArgumentException(args[0], str(e)) from None
+
+
+def bytes_to_string(args: List[MalExpression]) -> MalString:
+    if len(args) not in (1, 2):
+        raise MalSyntaxException("bytes->string requires bytes and optional charset")
+    try:
+        return MalString(str(_bytes(args[0]), _charset(args)))
+    except (LookupError, UnicodeError) as e:
+        raise MalInvalidArgumentException(args[0], str(e)) from None
+
+
+def hex_to_bytes(s: MalExpression) -> MalBytes:
+    try:
+        return MalBytes(bytes.fromhex(_string(s)))
+    except ValueError:
+        raise MalInvalidArgumentException(s, "not hex") from None
+
+
+def base64_to_bytes(s: MalExpression) -> MalBytes:
+    try:
+        return MalBytes(base64.b64decode(_string(s), validate=True))
+    except (ValueError, binascii.Error):
+        raise MalInvalidArgumentException(s, "not base64") from None
+
+
+def read_seq(a: MalExpression) -> MalExpression:
+    if isinstance(a, MalString):
+        return MalList(list(reader.iter_forms(a.native())))
+    raise MalInvalidArgumentException(a, "not a string")
+
+
+def _encoding(options: Dict[str, MalExpression]) -> Optional[str]:
+    encoding = options.get("encoding", MalNil())
+    return None if isinstance(encoding, MalNil) else _string(encoding)
+
+
+def slurp(args: List[MalExpression]) -> MalExpression:
+    if not args:
+        raise MalSyntaxException("slurp requires a file name")
+    filename = _string(args[0])
+    options = keyword_args(args[1:], ("encoding", "mmap", "binary"))
+    encoding = _encoding(options)
+    binary = not not_(options.get("binary", MalNil())).native()
+    if not_(options.get("mmap", MalNil())).native():
+        if binary:
+            with open(filename, "rb") as the_file:
+                return MalBytes(the_file.read())
+        with open(filename, "r", encoding=encoding) as the_file:
+            contents = the_file.read()
+        return MalString(contents)
+    # The mapping stays valid after the file is closed
+    with open(filename, "rb") as the_file:
+        if os.fstat(the_file.fileno()).st_size == 0:
+            return MalBytes(b"") if binary else MalString("")
+        buffer = mmap.mmap(the_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if binary:
+        return MalBytes(buffer)
+    return MalStringView(buffer, encoding or locale.getpreferredencoding(False))
+
+
+def spit(args: List[MalExpression]) -> MalNil:
+    if len(args) < 2:
+        raise MalSyntaxException("spit requires a file name and content")
+    filename = _string(args[0])
+    options = keyword_args(args[2:], ("append", "encoding"))
+    mode = "w" if not_(options.get("append", MalNil())).native() else "a"
+    with open(filename, mode, encoding=_encoding(options)) as the_file:
+        the_file.write(printer.pr_str(args[1], readably=False))
+    return MalNil()
+
+
+# Attributes Mal code may use on files from open. Files do not take the
+# interpreter's restrictions, so they must not reach Python internals.
+FILE_ATTRIBUTES = ("read", "readline", "write", "flush", "close", "closed", "name")
+FILE_POLICY = AccessPolicy(
+    {
+        cls: FILE_ATTRIBUTES
+        for cls in (
+            io.TextIOWrapper,
+            io.BufferedReader,
+            io.BufferedWriter,
+            io.BufferedRandom,
+        )
+    }
+)
+
+
+def open_(args: List[MalExpression]) -> MalPythonObject:
+    if not args:
+        raise MalSyntaxException("open requires a file name")
+    options = keyword_args(args[1:], ("mode", "encoding"))
+    mode = _string(options.get("mode", MalString("r")))
+    handle = open(_string(args[0]), mode, encoding=_encoding(options))
+    return MalPythonObject(handle, FILE_POLICY)
+
+
+def _strip_newline(line: str) -> MalString:
+    return MalString(line[:-1] if line.endswith("\n") else line)
+
+
+def lines(source: MalExpression) -> Iterable[str]:
+    """Lines of an open file or a string, with their newlines."""
+    if isinstance(source, MalStringView):
+        return source.lines()
+    if isinstance(source, MalString):
+        return source.native().splitlines(keepends=True)
+    if isinstance(source, MalPythonObject) and hasattr(source.native(), "readline"):
+        return source.native()
+    raise MalInvalidArgumentException(source, "not a file or string")
+
+
+def line_seq(source: MalExpression) -> MalLazySeq:
+    return MalLazySeq(map(_strip_newline, lines(source)))
+
+
+def with_open(resource: MalExpression, func: MalExpression) -> MalExpression:
+    if not isinstance(resource, MalPythonObject) or not hasattr(
+        resource.native(), "close"
+    ):
+        raise MalInvalidArgumentException(resource, "cannot be closed")
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    try:
+        return func.call([resource])
+    finally:
+        resource.native().close()
 
 
 def core_str(args: List[MalExpression]) -> MalString:
-    result = ""
-    for a in args:
-        result += a.unreadable_str()
-    return MalString(result)
+    return MalString("".join(printer.pr_str(a, readably=False) for a in args))
 
 
 def deref_q(atom: MalExpression) -> MalExpression:
@@ -148,12 +368,16 @@ def reset(atom: MalExpression, val: MalExpression) -> MalExpression:
 
 
 def cons(first: MalExpression, rest: MalExpression) -> MalExpression:
+    if isinstance(rest, MalLazySeq):
+        return MalLazySeq(itertools.chain((first,), rest.iterate()))
     if not isinstance(rest, MalList) and not isinstance(rest, MalVector):
         raise MalInvalidArgumentException(rest, "not a list or vector")
     return MalList([first] + rest.native())
 
 
 def concat(args: List[MalExpression]) -> MalExpression:
+    if args and isinstance(args[0], MalBytes):
+        return MalBytes(b"".join(_bytes(x) for x in args))
     result_list: List[MalExpression] = []
     for x in args:
         if not isinstance(x, MalList) and not isinstance(x, MalVector):
@@ -172,10 +396,22 @@ def not_(expr: MalExpression) -> MalExpression:
 
 
 def nth(list_: MalExpression, index: MalExpression) -> MalExpression:
+    if isinstance(list_, MalBytes):
+        try:
+            return MalInt(list_.native()[_int(index)])
+        except IndexError:
+            raise MalIndexError(index.native()) from None
     if not isinstance(list_, MalList) and not isinstance(list_, MalVector):
         raise MalInvalidArgumentException(list_, "not a list or vector")
     if not isinstance(index, MalInt):
         raise MalInvalidArgumentException(index, "not an int")
+    if isinstance(list_, MalLazySeq) and index.native() >= 0:
+        item = next(itertools.islice(list_.iterate(), index.native(), None), None)
+        if item is None:
+            raise MalIndexError(index.native())
+        return item
+    if isinstance(list_, MalSequenceView):
+        return list_.nth(index.native())
     list_native = list_.native()
     if index.native() > len(list_native) - 1:
         raise MalIndexError(index.native())
@@ -199,6 +435,10 @@ def apply(args: List[MalExpression]) -> MalExpression:
 def map_(func: MalExpression, map_list: MalExpression) -> MalExpression:
     if not isinstance(func, MalFunction):
         raise MalInvalidArgumentException(func, "not a function")
+    if isinstance(map_list, MalLazySeq):
+        return MalLazySeq(func.call([x]) for x in map_list.iterate())
+    if isinstance(map_list, MalSequenceView):
+        return MalList([func.call([x]) for x in map_list.iterate()])
     if not isinstance(map_list, MalList) and not isinstance(map_list, MalVector):
         raise MalInvalidArgumentException(map_list, "not a list or vector")
     result_list: List[MalExpression] = []
@@ -208,8 +448,45 @@ def map_(func: MalExpression, map_list: MalExpression) -> MalExpression:
     return MalList(result_list)
 
 
+def reduce_(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3):
+        raise MalSyntaxException(
+            "reduce requires a function, optional initial value and a sequence"
+        )
+    func = args[0]
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    # args is owned, see MalFunctionCompiled, so the sequence is taken out
+    # of it and a lazy seq does not keep the items already reduced
+    items = iterate_items(args.pop())
+    initial = args[1] if len(args) == 2 else None
+    if initial is not None:
+        value = initial
+    else:
+        first_item = next(items, None)
+        if first_item is None:
+            return func.call([])
+        value = first_item
+    for x in items:
+        value = func.call([value, x])
+    return value
+
+
+def take(n: MalExpression, coll: MalExpression) -> MalExpression:
+    if not isinstance(n, MalInt):
+        raise MalInvalidArgumentException(n, "not an int")
+    limit = max(n.native(), 0)
+    if isinstance(coll, MalLazySeq):
+        return MalLazySeq(itertools.islice(coll.iterate(), limit))
+    return MalList(list(itertools.islice(iterate_items(coll), limit)))
+
+
 def seq(obj: MalExpression) -> MalExpression:
-    if isinstance(obj, MalList):
+    if isinstance(obj, MalLazySeq):
+        return MalNil() if obj.empty() else obj
+    elif isinstance(obj, MalSequenceView):
+        return obj if obj.count() else MalNil()
+    elif isinstance(obj, MalList):
         return obj if obj.native() else MalNil()
     elif isinstance(obj, MalVector):
         return MalList(obj.native()) if obj.native() else MalNil()
@@ -217,6 +494,8 @@ def seq(obj: MalExpression) -> MalExpression:
         return (
             MalList([MalString(c) for c in obj.native()]) if obj.native() else MalNil()
         )
+    elif isinstance(obj, MalBytes):
+        return MalList([MalInt(b) for b in obj.native()]) if obj.native() else MalNil()
     elif isinstance(obj, MalNil):
         return obj
     else:
@@ -323,6 +602,9 @@ def get(map: MalExpression, key: MalExpression) -> MalExpression:
         return MalNil()
     if not isinstance(map, MalHash_map):
         raise MalInvalidArgumentException(map, "not a hash map")
+    if isinstance(map, MalMappingView):
+        value = map.get(key)
+        return MalNil() if value is None else value
     if isinstance(key, (MalString, MalKeyword)) and key in map.native():
         return map.native()[key]
     else:
@@ -332,17 +614,28 @@ def get(map: MalExpression, key: MalExpression) -> MalExpression:
 def first(args: List[MalExpression]) -> MalExpression:
     if isinstance(args[0], MalNil):
         return MalNil()
+    if isinstance(args[0], (MalLazySeq, MalSequenceView)):
+        item = args[0].first()
+        return MalNil() if item is None else item
     if isinstance(args[0], (MalList, MalVector)):
         lst = args[0].native()
         return lst[0] if lst else MalNil()
+    if isinstance(args[0], MalBytes):
+        data = args[0].native()
+        return MalInt(data[0]) if data else MalNil()
     raise MalInvalidArgumentException(args[0], "not a list")
 
 
 def rest(args: List[MalExpression]) -> MalExpression:
     if isinstance(args[0], MalNil):
         return MalList([])
+    if isinstance(args[0], (MalLazySeq, MalSequenceView)):
+        return args[0].rest()
     if isinstance(args[0], (MalList, MalVector)):
         return MalList(args[0].native()[1:])
+    if isinstance(args[0], MalBytes):
+        # Shares the buffer, like subs
+        return MalBytes(args[0].native()[1:])
     raise MalInvalidArgumentException(args[0], "not a list or vector")
 
 
@@ -392,6 +685,8 @@ def contains_q(args: List[MalExpression]) -> MalExpression:
         raise MalInvalidArgumentException(MalNil(), "contains? requires two arguments")
     if not isinstance(args[0], MalHash_map):
         raise MalInvalidArgumentException(args[0], "not a hash-map")
+    if isinstance(args[0], MalMappingView):
+        return MalBoolean(args[0].contains(args[1]))
     if not isinstance(args[1], (MalString, MalKeyword)):
         return MalBoolean(False)
     return MalBoolean(args[1] in args[0].native())
@@ -404,6 +699,8 @@ def keys(args: List[MalExpression]) -> MalExpression:
         )
     if not isinstance(args[0], MalHash_map):
         raise MalInvalidArgumentException(args[0], "not a hash map")
+    if isinstance(args[0], MalMappingView):
+        return MalList(args[0].keys())
     return MalList([x for x in args[0].native()])
 
 
@@ -461,12 +758,388 @@ def dot(args: List[MalExpression]) -> MalExpression:
     return python_object.dot(attr.native(), value)
 
 
-def native(obj: MalExpression) -> MalExpression:
+def native(obj: MalExpression, passthrough: bool = False) -> MalExpression:
+    """Convert a Python object to Mal values.
+
+    With passthrough, values that are not Python objects are returned
+    unchanged, since shared wrappers convert primitives directly."""
     if not isinstance(obj, MalPythonObject):
+        if passthrough:
+            return obj
         raise MalInvalidArgumentException(obj, "not a Python object")
     return obj.to_expression()
 
 
+def native_passthrough(args: List[MalExpression]) -> MalExpression:
+    """$ for interpreters sharing wrappers."""
+    return native(require_args(args, 1)[0], passthrough=True)
+
+
+def sequence_items(coll: MalExpression) -> List[MalExpression]:
+    if isinstance(coll, (MalList, MalVector)):
+        return coll.native()
+    if isinstance(coll, MalNil):
+        return []
+    raise MalInvalidArgumentException(coll, "not a sequence")
+
+
+def iterate_items(coll: MalExpression) -> Iterator[MalExpression]:
+    """Iterate over a sequence, reading lazy seqs and views as they are needed."""
+    if isinstance(coll, (MalLazySeq, MalSequenceView)):
+        return coll.iterate()
+    return iter(sequence_items(coll))
+
+
+def _compare(a: MalExpression, b: MalExpression) -> int:
+    if isinstance(a, MalNil) or isinstance(b, MalNil):
+        return int(not isinstance(a, MalNil)) - int(not isinstance(b, MalNil))
+    if isinstance(a, (MalInt, MalFloat)) and isinstance(b, (MalInt, MalFloat)):
+        pass
+    elif isinstance(a, MalString) and isinstance(b, MalString):
+        # Including string views
+        pass
+    elif isinstance(a, (MalList, MalVector)) and isinstance(b, (MalList, MalVector)):
+        a_items, b_items = a.native(), b.native()
+        if len(a_items) != len(b_items):
+            return -1 if len(a_items) < len(b_items) else 1
+        for x, y in zip(a_items, b_items):
+            c = _compare(x, y)
+            if c:
+                return c
+        return 0
+    elif type(a) is not type(b) or not isinstance(
+        a, (MalKeyword, MalSymbol, MalBoolean)
+    ):
+        raise MalInvalidArgumentException(b, f"not comparable to {a.readable_str()}")
+    x, y = a.native(), b.native()
+    return -1 if x < y else (1 if x > y else 0)
+
+
+def _comparator(func: MalExpression) -> Callable[[MalExpression, MalExpression], int]:
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+
+    def compare_with(a: MalExpression, b: MalExpression) -> int:
+        result = func.call([a, b])
+        if isinstance(result, (MalInt, MalFloat)):
+            r = result.native()
+            return -1 if r < 0 else (1 if r > 0 else 0)
+        # Boolean predicates such as < are treated as "less than"
+        if not_(result).native() is False:
+            return -1
+        return 1 if not_(func.call([b, a])).native() is False else 0
+
+    return compare_with
+
+
+def _sort_key(
+    values: List[MalExpression], comparator: Optional[MalExpression]
+) -> Callable[[MalExpression], Any]:
+    if comparator is not None:
+        return functools.cmp_to_key(_comparator(comparator))
+    # Homogeneous numbers or strings sort on their native values directly
+    if all(isinstance(v, (MalInt, MalFloat)) for v in values) or all(
+        isinstance(v, MalString) for v in values
+    ):
+        return operator.methodcaller("native")
+    return functools.cmp_to_key(_compare)
+
+
+def compare(a: MalExpression, b: MalExpression) -> MalExpression:
+    return MalInt(_compare(a, b))
+
+
+def sort(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (1, 2):
+        raise MalSyntaxException("sort requires an optional comparator and a sequence")
+    items = sequence_items(args[-1])
+    comparator = args[0] if len(args) == 2 else None
+    return MalList(sorted(items, key=_sort_key(items, comparator)))
+
+
+def sort_by(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3):
+        raise MalSyntaxException(
+            "sort-by requires a key function, optional comparator and a sequence"
+        )
+    key_func = args[0]
+    if not isinstance(key_func, MalFunction):
+        raise MalInvalidArgumentException(key_func, "not a function")
+    items = sequence_items(args[-1])
+    # Decorate-sort-undecorate, so key_func is called once per item
+    keys = [key_func.call([x]) for x in items]
+    key = _sort_key(keys, args[1] if len(args) == 3 else None)
+    decorated = sorted(zip(keys, items), key=lambda pair: key(pair[0]))
+    return MalList([item for _, item in decorated])
+
+
+def _map_key(key: MalExpression) -> Union[MalString, MalKeyword]:
+    if not isinstance(key, (MalString, MalKeyword)):
+        raise MalInvalidArgumentException(key, "not a string or keyword")
+    return key
+
+
+def group_by(func: MalExpression, coll: MalExpression) -> MalExpression:
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    groups: Dict[Union[MalString, MalKeyword], List[MalExpression]] = {}
+    for x in sequence_items(coll):
+        groups.setdefault(_map_key(func.call([x])), []).append(x)
+    return MalHash_map({k: MalVector(v) for k, v in groups.items()})
+
+
+def frequencies(coll: MalExpression) -> MalExpression:
+    counts: Dict[Union[MalString, MalKeyword], int] = {}
+    for x in sequence_items(coll):
+        key = _map_key(x)
+        counts[key] = counts.get(key, 0) + 1
+    return MalHash_map({k: MalInt(v) for k, v in counts.items()})
+
+
+def distinct(coll: MalExpression) -> MalExpression:
+    seen = set()
+    result: List[MalExpression] = []
+    for x in sequence_items(coll):
+        key = hash_key(x)
+        if key not in seen:
+            seen.add(key)
+            result.append(x)
+    return MalList(result)
+
+
+def partition(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3, 4):
+        raise MalSyntaxException(
+            "partition requires n, optional step and pad, and a sequence"
+        )
+    for arg in args[: min(2, len(args) - 1)]:
+        if not isinstance(arg, MalInt) or arg.native() < 1:
+            raise MalInvalidArgumentException(arg, "not a positive int")
+    n = cast(MalInt, args[0]).native()
+    step = cast(MalInt, args[1]).native() if len(args) > 2 else n
+    pad = sequence_items(args[2]) if len(args) == 4 else None
+    items = sequence_items(args[-1])
+    result: List[MalExpression] = []
+    for i in range(0, len(items), step):
+        end = i + n
+        chunk = items[i:end]
+        if len(chunk) < n:
+            if pad is None:
+                break
+            chunk = chunk + pad[: n - len(chunk)]
+            result.append(MalList(chunk))
+            break
+        result.append(MalList(chunk))
+    return MalList(result)
+
+
+def partition_by(func: MalExpression, coll: MalExpression) -> MalExpression:
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    result: List[MalExpression] = []
+    chunk: List[MalExpression] = []
+    previous: Optional[MalExpression] = None
+    for x in sequence_items(coll):
+        value = func.call([x])
+        if chunk and value != previous:
+            result.append(MalList(chunk))
+            chunk = []
+        chunk.append(x)
+        previous = value
+    if chunk:
+        result.append(MalList(chunk))
+    return MalList(result)
+
+
+PATTERN_CACHE_SIZE = 256
+pattern_cache = Cache(max_size=PATTERN_CACHE_SIZE)
+
+
+def compile_pattern(regex: str) -> MalPattern:
+    pattern = pattern_cache.get(regex)
+    if pattern is Cache.MISSING:
+        try:
+            pattern = MalPattern(re.compile(regex))
+        except re.error as e:
+            raise MalInvalidArgumentException(MalString(regex), str(e))
+        pattern_cache.put(regex, pattern)
+    return pattern
+
+
+def _pattern(regex: MalExpression) -> MalPattern:
+    if isinstance(regex, MalPattern):
+        return regex
+    if isinstance(regex, MalString):
+        return compile_pattern(regex.native())
+    raise MalInvalidArgumentException(regex, "not a pattern or string")
+
+
+def _string(s: MalExpression) -> str:
+    if not isinstance(s, MalString):
+        raise MalInvalidArgumentException(s, "not a string")
+    return s.native()
+
+
+def _int(i: MalExpression) -> int:
+    if not isinstance(i, MalInt):
+        raise MalInvalidArgumentException(i, "not an int")
+    return i.native()
+
+
+def _match_result(match: Optional[Match[str]]) -> MalExpression:
+    if match is None:
+        return MalNil()
+    if not match.re.groups:
+        return MalString(match.group(0))
+    return MalVector(
+        [MalString(match.group(0))]
+        + [MalNil() if g is None else MalString(g) for g in match.groups()]
+    )
+
+
+def subs(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3):
+        raise MalSyntaxException(
+            "subs requires a string or bytes, start and optional end"
+        )
+    # Bytes are sliced without copying
+    s = args[0].native() if isinstance(args[0], MalBytes) else _string(args[0])
+    start = _int(args[1])
+    end = _int(args[2]) if len(args) == 3 else len(s)
+    if not 0 <= start <= end <= len(s):
+        raise MalIndexError(end if start <= end else start)
+    if isinstance(args[0], MalBytes):
+        return MalBytes(s[start:end])
+    return MalString(s[start:end])
+
+
+def join(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (1, 2):
+        raise MalSyntaxException("join requires an optional separator and a sequence")
+    separator = _string(args[0]) if len(args) == 2 else ""
+    return MalString(
+        separator.join(x.unreadable_str() for x in sequence_items(args[-1]))
+    )
+
+
+def split(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3):
+        raise MalSyntaxException(
+            "split requires a string, a separator and optional limit"
+        )
+    s = _string(args[0])
+    limit = _int(args[2]) if len(args) == 3 else 0
+    if isinstance(args[1], MalString):
+        if not args[1].native():
+            raise MalInvalidArgumentException(args[1], "empty separator")
+        parts = s.split(args[1].native(), limit - 1 if limit > 0 else -1)
+    else:
+        pattern = _pattern(args[1]).native()
+        # re.split treats a maxsplit of 0 as no limit
+        parts = [s] if limit == 1 else pattern.split(s, max(limit - 1, 0))
+    if limit == 0:
+        while parts and not parts[-1]:
+            parts.pop()
+    return MalVector([MalString(p) for p in parts])
+
+
+def _replacement(
+    replacement: MalExpression,
+) -> Union[str, Callable[[Match[str]], str]]:
+    if isinstance(replacement, MalString):
+        # Translate $1 style group references into Python's \g<1>
+        template = replacement.native().replace("\\", "\\\\")
+        return re.sub(r"\$(\d+)", r"\\g<\1>", template)
+    if isinstance(replacement, MalFunction):
+        func = replacement
+        return lambda m: _string(func.call([_match_result(m)]))
+    raise MalInvalidArgumentException(replacement, "not a string or function")
+
+
+def replace(
+    s: MalExpression, match: MalExpression, replacement: MalExpression
+) -> MalExpression:
+    string = _string(s)
+    if isinstance(match, MalString):
+        return MalString(string.replace(match.native(), _string(replacement)))
+    return MalString(_pattern(match).native().sub(_replacement(replacement), string))
+
+
+def re_find(regex: MalExpression, s: MalExpression) -> MalExpression:
+    return _match_result(_pattern(regex).native().search(_string(s)))
+
+
+def re_matches(regex: MalExpression, s: MalExpression) -> MalExpression:
+    return _match_result(_pattern(regex).native().fullmatch(_string(s)))
+
+
+def re_seq(regex: MalExpression, s: MalExpression) -> MalExpression:
+    return MalList(
+        [_match_result(m) for m in _pattern(regex).native().finditer(_string(s))]
+    )
+
+
+def keyword_args(
+    args: List[MalExpression], names: Iterable[str]
+) -> Dict[str, MalExpression]:
+    if len(args) % 2 != 0:
+        raise MalSyntaxException("options require keyword and value pairs")
+    options: Dict[str, MalExpression] = {}
+    for i in range(0, len(args), 2):
+        key = args[i]
+        if not isinstance(key, MalKeyword) or key.native() not in names:
+            raise MalInvalidArgumentException(key, "unknown option")
+        options[key.native()] = args[i + 1]
+    return options
+
+
+def memoize(args: List[MalExpression]) -> MalExpression:
+    if not args:
+        raise MalSyntaxException("memoize requires a function")
+    func = args[0]
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    options = keyword_args(args[1:], ("max-size", "ttl-ms", "policy"))
+    max_size = options.get("max-size", MalNil())
+    if not isinstance(max_size, MalNil) and not (
+        isinstance(max_size, MalInt) and max_size.native() > 0
+    ):
+        raise MalInvalidArgumentException(max_size, "not a positive int")
+    ttl_ms = options.get("ttl-ms", MalNil())
+    if not isinstance(ttl_ms, MalNil) and not (
+        isinstance(ttl_ms, (MalInt, MalFloat)) and ttl_ms.native() > 0
+    ):
+        raise MalInvalidArgumentException(ttl_ms, "not a positive number")
+    policy = options.get("policy", MalKeyword("lru"))
+    if not isinstance(policy, MalKeyword) or policy.native() not in POLICIES:
+        raise MalInvalidArgumentException(policy, "not a cache policy")
+    ttl = ttl_ms.native()
+    cache = Cache(
+        max_size=max_size.native(),
+        ttl=None if ttl is None else ttl / 1000,
+        policy=policy.native(),
+    )
+    return MalFunctionMemoized(func, cache)
+
+
+def memoize_stats(func: MalExpression) -> MalExpression:
+    if not isinstance(func, MalFunctionMemoized):
+        raise MalInvalidArgumentException(func, "not a memoized function")
+    return MalHash_map(
+        {
+            MalKeyword(name): MalInt(value)
+            for name, value in func.cache.stats._asdict().items()
+        }
+    )
+
+
+def memoize_clear(func: MalExpression) -> MalExpression:
+    if not isinstance(func, MalFunctionMemoized):
+        raise MalInvalidArgumentException(func, "not a memoized function")
+    func.cache.clear()
+    return MalNil()
+
+
 def require_args(args: List[MalExpression], count: int) -> List[MalExpression]:
     if len(args) != count:
         raise MalSyntaxException("not enough arguments")
@@ -481,6 +1154,7 @@ ns = {
     "prn": MalFunctionCompiled(lambda args: prn(args)),
     "pr-str": MalFunctionCompiled(lambda args: pr_str(args)),
     "println": MalFunctionCompiled(lambda args: println(args)),
+    "pprint": MalFunctionCompiled(pprint),
     "list": MalFunctionCompiled(lambda args: MalList(args)),
     "list?": MalFunctionCompiled(lambda args: list_q(require_args(args, 1)[0])),
     "empty?": MalFunctionCompiled(lambda args: empty_q(require_args(args, 1)[0])),
@@ -495,7 +1169,14 @@ ns = {
     "read-string": MalFunctionCompiled(
         lambda args: read_string(require_args(args, 1)[0])
     ),
-    "slurp": MalFunctionCompiled(lambda args: slurp(require_args(args, 1)[0])),
+    "read-seq": MalFunctionCompiled(lambda args: read_seq(require_args(args, 1)[0])),
+    "encode": MalFunctionCompiled(lambda args: encode(require_args(args, 1)[0])),
+    "decode": MalFunctionCompiled(lambda args: decode(require_args(args, 1)[0])),
+    "slurp": MalFunctionCompiled(slurp),
+    "spit": MalFunctionCompiled(spit),
+    "open": MalFunctionCompiled(open_),
+    "line-seq": MalFunctionCompiled(lambda args: line_seq(require_args(args, 1)[0])),
+    "with-open*": MalFunctionCompiled(lambda args: with_open(*require_args(args, 2))),
     "str": MalFunctionCompiled(lambda args: core_str(args)),
     "atom": MalFunctionCompiled(lambda args: MalAtom(require_args(args, 1)[0])),
     "atom?": MalFunctionCompiled(
@@ -509,6 +1190,8 @@ ns = {
     "nth": MalFunctionCompiled(lambda args: nth(*require_args(args, 2))),
     "apply": MalFunctionCompiled(lambda args: apply(args)),
     "map": MalFunctionCompiled(lambda args: map_(*require_args(args, 2))),
+    "reduce": MalFunctionCompiled(reduce_, owns_args=True),
+    "take": MalFunctionCompiled(lambda args: take(*require_args(args, 2))),
     "throw": MalFunctionCompiled(lambda args: throw(require_args(args, 1)[0])),
     "nil?": MalFunctionCompiled(lambda args: nil_q(require_args(args, 1)[0])),
     "true?": MalFunctionCompiled(lambda args: true_q(require_args(args, 1)[0])),
@@ -551,4 +1234,73 @@ ns = {
     "swap!": MalFunctionCompiled(lambda args: swap(args)),
     ".": MalFunctionCompiled(lambda args: dot(args)),
     "$": MalFunctionCompiled(lambda args: native(require_args(args, 1)[0])),
+    "memoize": MalFunctionCompiled(memoize),
+    "memoize-stats": MalFunctionCompiled(
+        lambda args: memoize_stats(require_args(args, 1)[0])
+    ),
+    "memoize-clear!": MalFunctionCompiled(
+        lambda args: memoize_clear(require_args(args, 1)[0])
+    ),
+    "compare": MalFunctionCompiled(lambda args: compare(*require_args(args, 2))),
+    "sort": MalFunctionCompiled(sort),
+    "sort-by": MalFunctionCompiled(sort_by),
+    "group-by": MalFunctionCompiled(lambda args: group_by(*require_args(args, 2))),
+    "frequencies": MalFunctionCompiled(
+        lambda args: frequencies(require_args(args, 1)[0])
+    ),
+    "distinct": MalFunctionCompiled(lambda args: distinct(require_args(args, 1)[0])),
+    "partition": MalFunctionCompiled(partition),
+    "partition-by": MalFunctionCompiled(
+        lambda args: partition_by(*require_args(args, 2))
+    ),
+    "subs": MalFunctionCompiled(subs),
+    "bytes": MalFunctionCompiled(lambda args: bytes_(require_args(args, 1)[0])),
+    "bytes?": MalFunctionCompiled(
+        lambda args: MalBoolean(isinstance(require_args(args, 1)[0], MalBytes))
+    ),
+    "string->bytes": MalFunctionCompiled(string_to_bytes),
+    "bytes->string": MalFunctionCompiled(bytes_to_string),
+    "bytes->hex": MalFunctionCompiled(
+        lambda args: MalString(_bytes(require_args(args, 1)[0]).hex())
+    ),
+    "hex->bytes": MalFunctionCompiled(
+        lambda args: hex_to_bytes(require_args(args, 1)[0])
+    ),
+    "bytes->base64": MalFunctionCompiled(
+        lambda args: MalString(
+            base64.b64encode(_bytes(require_args(args, 1)[0])).decode("ascii")
+        )
+    ),
+    "base64->bytes": MalFunctionCompiled(
+        lambda args: base64_to_bytes(require_args(args, 1)[0])
+    ),
+    "join": MalFunctionCompiled(join),
+    "split": MalFunctionCompiled(split),
+    "trim": MalFunctionCompiled(
+        lambda args: MalString(_string(require_args(args, 1)[0]).strip())
+    ),
+    "upper-case": MalFunctionCompiled(
+        lambda args: MalString(_string(require_args(args, 1)[0]).upper())
+    ),
+    "lower-case": MalFunctionCompiled(
+        lambda args: MalString(_string(require_args(args, 1)[0]).lower())
+    ),
+    "starts-with?": MalFunctionCompiled(
+        lambda args: MalBoolean(
+            _string(require_args(args, 2)[0]).startswith(_string(args[1]))
+        )
+    ),
+    "ends-with?": MalFunctionCompiled(
+        lambda args: MalBoolean(
+            _string(require_args(args, 2)[0]).endswith(_string(args[1]))
+        )
+    ),
+    "includes?": MalFunctionCompiled(
+        lambda args: MalBoolean(_string(args[1]) in _string(require_args(args, 2)[0]))
+    ),
+    "replace": MalFunctionCompiled(lambda args: replace(*require_args(args, 3))),
+    "re-pattern": MalFunctionCompiled(lambda args: _pattern(require_args(args, 1)[0])),
+    "re-find": MalFunctionCompiled(lambda args: re_find(*require_args(args, 2))),
+    "re-matches": MalFunctionCompiled(lambda args: re_matches(*require_args(args, 2))),
+    "re-seq": MalFunctionCompiled(lambda args: re_seq(*require_args(args, 2))),
 }
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Dict, List, Any, TYPE_CHECKING
+from typing import Optional, Dict, List, Any, Union, TYPE_CHECKING
 import time
 
 from .mal_types import (
@@ -10,15 +10,22 @@ from .mal_types import (
     MalUnknownSymbolException,
     MalInvalidArgumentException,
     expression_from_native,
+    AccessPolicy,
 )
 
 if TYPE_CHECKING:
     from .mal_types import Restrictions
+    from .output import OutputSink
+    from .printer import PrintLimits
 
 
 class Env(object):
     """MAL Environment"""
 
+    # Set on the root environment by init_repl_env
+    output: Optional[OutputSink] = None
+    print_limits: Optional[PrintLimits] = None
+
     def __init__(
         self,
         outer: Optional[Env],
@@ -63,10 +70,14 @@ class Env(object):
         return location.get(key)
 
     def inject_native(
-        self, injections: Dict[str, Any], restrictions: Optional[Restrictions] = None
+        self,
+        injections: Dict[str, Any],
+        restrictions: Union[Restrictions, AccessPolicy, None] = None,
     ):
+        # Normalized once, and shared by everything reached from the injections
+        policy = AccessPolicy.of(restrictions)
         for var, obj in injections.items():
-            self.set(var, expression_from_native(obj, restrictions))
+            self.set(var, expression_from_native(obj, policy))
 
     def check_execution_limit(self):
         if self._execution_limit:
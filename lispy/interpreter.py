@@ -1,10 +1,30 @@
 from __future__ import annotations
-from typing import Dict, Optional, Any, TYPE_CHECKING
+from typing import Callable, Dict, Optional, Any, Union, TYPE_CHECKING
 from .rep import init_repl_env, repl, load_file, EVAL, READ
+from .mal_types import (
+    AccessPolicy,
+    MalFunction,
+    MalFunctionCompiled,
+    MalFunctionMemoized,
+    MalInvalidArgumentException,
+    expression_from_python,
+    expression_to_native,
+)
+from .parallel import WorkerPool
+from .cache import Cache
+from .output import OutputSink
+from .printer import PrintLimits, pr_limited
+from . import codec, core
 
 if TYPE_CHECKING:
     from .mal_types import Restrictions, MalExpression
     from .env import ExecutionLimit
+    from .cache import CacheStats
+
+PARSE_CACHE_SIZE = 1024
+
+# Parsed forms keyed by source text, shared by all Lispy instances
+parse_cache = Cache(max_size=PARSE_CACHE_SIZE)
 
 
 class Lispy:
@@ -15,22 +35,115 @@ class Lispy:
         restricted: bool = False,
         execution_limit: Optional[ExecutionLimit] = None,
         verbose: bool = False,
+        worker_pool: Optional[WorkerPool] = None,
+        parse_cache: Optional[Cache] = parse_cache,
+        output: Optional[OutputSink] = None,
+        print_limits: Optional[PrintLimits] = None,
+        share_wrappers: bool = False,
     ):
         self.restrictions = restrictions
+        self.access_policy = AccessPolicy(restrictions, share_wrappers)
+        self.parse_cache = parse_cache
+        self.output = OutputSink() if output is None else output
+        self._owns_worker_pool = worker_pool is None
+        self.worker_pool = WorkerPool() if worker_pool is None else worker_pool
         self.env = init_repl_env(
-            argv=[], restricted=restricted, execution_limit=execution_limit
+            argv=[],
+            restricted=restricted,
+            execution_limit=execution_limit,
+            worker_pool=self.worker_pool,
+            output=self.output,
+            print_limits=print_limits,
         )
         self.verbose = verbose
+        if share_wrappers:
+            self.env.set("$", MalFunctionCompiled(core.native_passthrough))
         if injections:
-            self.env.inject_native(injections, restrictions)
+            self.env.inject_native(injections, self.access_policy)
 
     def eval(self, expr: str) -> MalExpression:
         self.env.reset_execution_limit()
-        return EVAL(READ(expr), self.env)
+        self.output.reset_quota()
+        try:
+            return EVAL(self.read(expr), self.env)
+        finally:
+            self.output.flush()
+
+    def read(self, expr: str) -> MalExpression:
+        if self.parse_cache is None:
+            return READ(expr)
+        ast = self.parse_cache.get(expr)
+        if ast is Cache.MISSING:
+            ast = READ(expr)
+            self.parse_cache.put(expr, ast)
+        return ast
 
     def load_file(self, filename: str) -> str:
         self.env.reset_execution_limit()
-        return load_file(self.env, filename, self.verbose)
+        self.output.reset_quota()
+        try:
+            return load_file(self.env, filename, self.verbose)
+        finally:
+            self.output.flush()
+
+    def function(self, name: str) -> Callable[..., Any]:
+        """Return a Python callable for the Mal function defined as name.
+
+        Calling it is like evaluating (name args...), without reading any
+        source. Arguments are converted as $ converts Python objects, and
+        the result with expression_to_native. The function is looked up once,
+        so later redefinitions of name are not seen."""
+        func = self.env.get(name)
+        if not isinstance(func, MalFunction) or func.is_macro():
+            raise MalInvalidArgumentException(func, "not a function")
+        env, output, policy = self.env, self.output, self.access_policy
+
+        def call(*args: Any) -> Any:
+            env.reset_execution_limit()
+            output.reset_quota()
+            try:
+                mal_args = [expression_from_python(x, policy) for x in args]
+                return expression_to_native(func.call(mal_args))
+            finally:
+                output.flush()
+
+        call.__name__ = call.__qualname__ = name
+        return call
+
+    def pr_str(self, value: MalExpression, readably: bool = True) -> str:
+        """Print value within the print limits given to the constructor."""
+        return pr_limited(value, self.env.print_limits, readably)
+
+    def encode(self, value: MalExpression) -> bytes:
+        return codec.encode(value)
+
+    def decode(self, data: Union[bytes, bytearray, memoryview]) -> MalExpression:
+        return codec.decode(data)
 
     def repl(self):
         repl(self.env, self.verbose)
+
+    def close(self) -> None:
+        """Flush output and shut down the worker pool, unless it was supplied
+        by the caller."""
+        self.output.flush()
+        if self._owns_worker_pool:
+            self.worker_pool.shutdown()
+
+    def __enter__(self) -> Lispy:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def memoize_stats(self, name: str) -> CacheStats:
+        return self._memoized(name).cache.stats
+
+    def clear_memoized(self, name: str) -> None:
+        self._memoized(name).cache.clear()
+
+    def _memoized(self, name: str) -> MalFunctionMemoized:
+        func = self.env.get(name)
+        if not isinstance(func, MalFunctionMemoized):
+            raise MalInvalidArgumentException(func, "not a memoized function")
+        return func
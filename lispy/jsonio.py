@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple, Union
+import json
+
+from .core import keyword_args, lines, not_
+from .mal_types import (
+    MalExpression,
+    MalBoolean,
+    MalFloat,
+    MalFunctionCompiled,
+    MalHash_map,
+    MalInt,
+    MalKeyword,
+    MalLazySeq,
+    MalList,
+    MalNil,
+    MalPythonObject,
+    MalString,
+    MalVector,
+    MalInvalidArgumentException,
+    MalSyntaxException,
+)
+
+
+class Decoder:
+    """Decodes JSON text directly into Mal values.
+
+    Objects become hash-maps as they are parsed, with each distinct key
+    converted to a keyword or string once. Other values are converted by
+    type when their containing object, array or document is complete."""
+
+    def __init__(self, keywordize: bool = False) -> None:
+        self._key_type = MalKeyword if keywordize else MalString
+        self._keys: Dict[str, Union[MalString, MalKeyword]] = {}
+        self._converters: Dict[type, Callable[[Any], MalExpression]] = {
+            str: MalString,
+            int: MalInt,
+            float: MalFloat,
+            bool: MalBoolean,
+            type(None): lambda _: MalNil(),
+            list: self._vector,
+            MalHash_map: lambda value: value,
+        }
+        self._decoder = json.JSONDecoder(object_pairs_hook=self._hash_map)
+
+    def _key(self, key: str) -> Union[MalString, MalKeyword]:
+        mal_key = self._keys.get(key)
+        if mal_key is None:
+            mal_key = self._keys[key] = self._key_type(key)
+        return mal_key
+
+    def _hash_map(self, pairs: List[Tuple[str, Any]]) -> MalHash_map:
+        converters = self._converters
+        return MalHash_map({self._key(k): converters[type(v)](v) for k, v in pairs})
+
+    def _vector(self, values: List[Any]) -> MalVector:
+        converters = self._converters
+        return MalVector([converters[type(v)](v) for v in values])
+
+    def decode(self, text: str) -> MalExpression:
+        try:
+            value = self._decoder.decode(text)
+        except ValueError as e:
+            raise MalSyntaxException(f"invalid JSON: {e}") from None
+        return self._converters[type(value)](value)
+
+
+def _decoder(options: Dict[str, MalExpression]) -> Decoder:
+    return Decoder(keywordize=not not_(options.get("keywordize", MalNil())).native())
+
+
+def _text(source: MalExpression) -> str:
+    if isinstance(source, MalString):
+        return source.native()
+    if isinstance(source, MalPythonObject) and hasattr(source.native(), "read"):
+        return source.native().read()
+    raise MalInvalidArgumentException(source, "not a file or string")
+
+
+def json_read(args: List[MalExpression]) -> MalExpression:
+    if not args:
+        raise MalSyntaxException("json-read requires a string or file")
+    return _decoder(keyword_args(args[1:], ("keywordize",))).decode(_text(args[0]))
+
+
+def json_lines(args: List[MalExpression]) -> MalLazySeq:
+    """A lazy seq of the values on each non-blank line of a file or string."""
+    if not args:
+        raise MalSyntaxException("json-lines requires a string or file")
+    decoder = _decoder(keyword_args(args[1:], ("keywordize",)))
+    return MalLazySeq(
+        decoder.decode(line) for line in lines(args[0]) if not line.isspace()
+    )
+
+
+def _default(value: Any) -> Any:
+    # Called by the encoder for each Mal value
+    if isinstance(value, (MalList, MalVector)):
+        return value.native()
+    if isinstance(value, MalHash_map):
+        return {k.native(): v for k, v in value.native().items()}
+    if isinstance(value, (MalString, MalKeyword, MalInt, MalFloat, MalBoolean)):
+        return value.native()
+    if isinstance(value, MalNil):
+        return None
+    raise MalInvalidArgumentException(value, "cannot be written as JSON")
+
+
+def json_write(args: List[MalExpression]) -> MalString:
+    if not args:
+        raise MalSyntaxException("json-write requires a value")
+    indent = keyword_args(args[1:], ("indent",)).get("indent", MalNil())
+    if not isinstance(indent, (MalNil, MalInt)):
+        raise MalInvalidArgumentException(indent, "not an int")
+    try:
+        text = json.dumps(args[0], default=_default, indent=indent.native())
+    except ValueError as e:
+        # Circular references
+        raise MalInvalidArgumentException(args[0], str(e)) from None
+    return MalString(text)
+
+
+ns = {
+    "json-read": MalFunctionCompiled(json_read),
+    "json-write": MalFunctionCompiled(json_write),
+    "json-lines": MalFunctionCompiled(json_lines),
+}
@@ -0,0 +1,193 @@
+from __future__ import annotations
+from typing import Callable, List
+import itertools
+
+from .mal_types import (
+    MalExpression,
+    MalException,
+    MalFunctionCompiled,
+    MalList,
+    MalVector,
+    MalNil,
+    MalBoolean,
+    MalString,
+    MalSymbol,
+    MalSyntaxException,
+    MalInvalidArgumentException,
+)
+
+IF = MalSymbol("if")
+DO = MalSymbol("do")
+LET = MalSymbol("let*")
+FN = MalSymbol("fn*")
+PCALLS = MalSymbol("pcalls")
+WITH_OPEN = MalSymbol("with-open*")
+
+_gensym_counter = itertools.count(1)
+
+
+def gensym() -> MalSymbol:
+    return MalSymbol(f"G__lispy{next(_gensym_counter)}")
+
+
+def macro(
+    transformer: Callable[[List[MalExpression]], MalExpression]
+) -> MalFunctionCompiled:
+    """Wrap a Python AST transformer as a macro."""
+    f = MalFunctionCompiled(transformer)
+    f.make_macro()
+    return f
+
+
+def _require_forms(name: str, args: List[MalExpression], count: int) -> None:
+    if len(args) < count:
+        raise MalSyntaxException(f"{name} requires at least {count} arguments")
+
+
+def _thread_first(x: MalExpression, form: MalExpression) -> MalExpression:
+    if isinstance(form, MalList) and form.native():
+        items = form.native()
+        return MalList([items[0], x] + items[1:])
+    return MalList([form, x])
+
+
+def _thread_last(x: MalExpression, form: MalExpression) -> MalExpression:
+    if isinstance(form, MalList) and form.native():
+        return MalList(form.native() + [x])
+    return MalList([form, x])
+
+
+def thread_first(args: List[MalExpression]) -> MalExpression:
+    _require_forms("->", args, 1)
+    x = args[0]
+    for form in args[1:]:
+        x = _thread_first(x, form)
+    return x
+
+
+def thread_last(args: List[MalExpression]) -> MalExpression:
+    _require_forms("->>", args, 1)
+    x = args[0]
+    for form in args[1:]:
+        x = _thread_last(x, form)
+    return x
+
+
+def thread_as(args: List[MalExpression]) -> MalExpression:
+    _require_forms("as->", args, 2)
+    name = args[1]
+    if not isinstance(name, MalSymbol):
+        raise MalInvalidArgumentException(name, "not a symbol")
+    bindings: List[MalExpression] = [name, args[0]]
+    for form in args[2:]:
+        bindings += [name, form]
+    return MalList([LET, MalVector(bindings), name])
+
+
+def cond_thread_first(args: List[MalExpression]) -> MalExpression:
+    _require_forms("cond->", args, 1)
+    clauses = args[1:]
+    if len(clauses) % 2 != 0:
+        raise MalSyntaxException("cond-> requires an even number of clauses")
+    g = gensym()
+    bindings: List[MalExpression] = [g, args[0]]
+    for i in range(0, len(clauses), 2):
+        step = _thread_first(g, clauses[i + 1])
+        bindings += [g, MalList([IF, clauses[i], step, g])]
+    return MalList([LET, MalVector(bindings), g])
+
+
+def and_(args: List[MalExpression]) -> MalExpression:
+    if not args:
+        return MalBoolean(True)
+    result = args[-1]
+    for x in reversed(args[:-1]):
+        g = gensym()
+        result = MalList([LET, MalVector([g, x]), MalList([IF, g, result, g])])
+    return result
+
+
+def or_(args: List[MalExpression]) -> MalExpression:
+    if not args:
+        return MalNil()
+    result = args[-1]
+    for x in reversed(args[:-1]):
+        g = gensym()
+        result = MalList([LET, MalVector([g, x]), MalList([IF, g, g, result])])
+    return result
+
+
+def _body(forms: List[MalExpression]) -> MalExpression:
+    # do requires at least one form
+    return MalList([DO] + forms) if forms else MalNil()
+
+
+def when(args: List[MalExpression]) -> MalExpression:
+    _require_forms("when", args, 1)
+    return MalList([IF, args[0], _body(args[1:])])
+
+
+def when_not(args: List[MalExpression]) -> MalExpression:
+    _require_forms("when-not", args, 1)
+    return MalList([IF, args[0], MalNil(), _body(args[1:])])
+
+
+def if_let(args: List[MalExpression]) -> MalExpression:
+    if len(args) not in (2, 3):
+        raise MalSyntaxException("if-let requires bindings, then and optional else")
+    bindings = args[0]
+    if (
+        not isinstance(bindings, (MalList, MalVector))
+        or len(bindings.native()) != 2
+        or not isinstance(bindings.native()[0], MalSymbol)
+    ):
+        raise MalInvalidArgumentException(bindings, "not a symbol and test binding")
+    name, test = bindings.native()
+    g = gensym()
+    then = MalList([LET, MalVector([name, g]), args[1]])
+    return MalList([LET, MalVector([g, test]), MalList([IF, g, then] + args[2:])])
+
+
+def cond(args: List[MalExpression]) -> MalExpression:
+    if len(args) % 2 != 0:
+        raise MalException(MalString("odd number of forms to cond"))
+    result: MalExpression = MalNil()
+    for i in range(len(args) - 2, -1, -2):
+        result = MalList([IF, args[i], args[i + 1], result])
+    return result
+
+
+def pvalues(args: List[MalExpression]) -> MalExpression:
+    return MalList([PCALLS] + [MalList([FN, MalList([]), x]) for x in args])
+
+
+def with_open(args: List[MalExpression]) -> MalExpression:
+    _require_forms("with-open", args, 1)
+    bindings = args[0]
+    if not isinstance(bindings, (MalList, MalVector)) or len(bindings.native()) % 2:
+        raise MalInvalidArgumentException(bindings, "not an even length binding vector")
+    items = bindings.native()
+    result = _body(args[1:])
+    # Each resource is closed by with-open* after the forms inside it
+    for i in range(len(items) - 2, -1, -2):
+        if not isinstance(items[i], MalSymbol):
+            raise MalInvalidArgumentException(items[i], "not a symbol")
+        body = MalList([FN, MalVector([items[i]]), result])
+        result = MalList([WITH_OPEN, items[i + 1], body])
+    return result
+
+
+ns = {
+    "->": macro(thread_first),
+    "->>": macro(thread_last),
+    "as->": macro(thread_as),
+    "cond->": macro(cond_thread_first),
+    "and": macro(and_),
+    "or": macro(or_),
+    "when": macro(when),
+    "when-not": macro(when_not),
+    "if-let": macro(if_let),
+    "cond": macro(cond),
+    "pvalues": macro(pvalues),
+    "with-open": macro(with_open),
+}
@@ -1,16 +1,35 @@
 from __future__ import annotations
 from typing import (
     Callable,
+    Deque,
     Dict,
+    FrozenSet,
+    Hashable,
     List,
     Iterable,
+    Iterator,
     Any,
+    Mapping,
+    NamedTuple,
     Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    TypeVar,
     Union,
     TYPE_CHECKING,
     cast,
 )
 import abc
+import bisect
+import collections
+import collections.abc
+import itertools
+import re
+import threading
+import weakref
+
+from .cache import Cache
 
 if TYPE_CHECKING:
     from .env import Env
@@ -43,9 +62,86 @@ class MalExpression(metaclass=abc.ABCMeta):
         return self.readable_str()
 
 
+WRAPPER_CACHE_SIZE = 256
+
+
+class AccessPolicy:
+    """Attributes that Mal code may access on injected Python objects.
+
+    restrictions maps types to the attribute names allowed on instances
+    of the type and its subclasses, and objects of other types allow no
+    attributes. Without restrictions all attributes are allowed.
+    The names allowed for each type are worked out once, on first use.
+
+    With share_wrappers, values crossing into Mal are converted by wrap."""
+
+    def __init__(
+        self, restrictions: Optional[Restrictions] = None, share_wrappers: bool = False
+    ) -> None:
+        self.restrictions = restrictions
+        self.shares_wrappers = share_wrappers
+        # Keyed by id, which is not reused while the wrapper keeps the object alive
+        self._wrappers: weakref.WeakValueDictionary[
+            int, MalPythonObject
+        ] = weakref.WeakValueDictionary()
+        # The most recent wrappers are kept alive, so repeated access shares them
+        self._recent: Deque[MalPythonObject] = collections.deque(
+            maxlen=WRAPPER_CACHE_SIZE
+        )
+        self.restricted = bool(restrictions)
+        self._declared = {
+            cls: frozenset(attrs) for cls, attrs in (restrictions or {}).items()
+        }
+        self.allowed_by_type: Dict[type, FrozenSet[str]] = {}
+
+    @classmethod
+    def of(cls, restrictions: Union[Restrictions, AccessPolicy, None]) -> AccessPolicy:
+        if isinstance(restrictions, AccessPolicy):
+            return restrictions
+        if not restrictions:
+            return UNRESTRICTED
+        return cls(restrictions)
+
+    def allowed(self, cls: type) -> FrozenSet[str]:
+        """Attributes allowed on instances of cls, if restricted."""
+        allowed = self.allowed_by_type.get(cls)
+        if allowed is None:
+            declared = self._declared
+            allowed = frozenset().union(
+                *(declared[base] for base in cls.__mro__ if base in declared)
+            )
+            self.allowed_by_type[cls] = allowed
+        return allowed
+
+    def wrap(self, obj: Any) -> MalExpression:
+        """Convert str, int, float, bool and None to Mal values, and wrap
+        other objects, reusing the wrapper of an object while it is alive."""
+        convert = _PRIMITIVES.get(type(obj))
+        if convert is not None:
+            return convert(obj)
+        wrapper = self._wrappers.get(id(obj))
+        if wrapper is None:
+            if callable(obj):
+                wrapper = MalFunctionPython(obj, self)
+            else:
+                wrapper = MalPythonObject(obj, self)
+            self._wrappers[id(obj)] = wrapper
+            self._recent.append(wrapper)
+        return wrapper
+
+
+UNRESTRICTED = AccessPolicy()
+
+
 class MalPythonObject(MalExpression):
-    def __init__(self, native: Any, restrictions: Optional[Restrictions] = None):
+    # Set once a single pass iterator has been read, see to_expression
+    _read = False
+
+    def __init__(
+        self, native: Any, restrictions: Union[Restrictions, AccessPolicy, None] = None,
+    ):
         self._python_native = native
+        # Normalized to an AccessPolicy by the first dot
         self._restrictions = restrictions
 
     def native(self) -> Any:
@@ -55,7 +151,7 @@ class MalPythonObject(MalExpression):
         return repr(repr(self._python_native))
 
     @property
-    def restrictions(self) -> Optional[Restrictions]:
+    def restrictions(self) -> Union[Restrictions, AccessPolicy, None]:
         return self._restrictions
 
     def to_expression(self) -> MalExpression:
@@ -70,14 +166,39 @@ class MalPythonObject(MalExpression):
             return MalInt(obj)
         if obj is None:
             return MalNil()
-        if isinstance(obj, (list, tuple)):
-            return MalList([expression_from_native(x, self.restrictions) for x in obj])
+        if isinstance(obj, _BYTES):
+            return MalBytes(obj)
+        if isinstance(obj, (list, tuple, Sequence)):
+            return MalSequenceView(obj, AccessPolicy.of(self.restrictions))
+        if isinstance(obj, Mapping):
+            # Keys are checked as they are read, see MalMappingView.keys
+            return MalMappingView(obj, AccessPolicy.of(self.restrictions))
+        if isinstance(obj, Iterable):
+            return self._lazy_seq(obj)
         return self
 
+    def _lazy_seq(self, obj: Iterable[Any]) -> MalLazySeq:
+        policy = AccessPolicy.of(self.restrictions)
+        with _SEQ_LOCK:
+            iterator = iter(obj)
+            # Iterators can only be read once. The seq is not kept with the
+            # wrapper, so items can be collected once nothing refers to them.
+            if iterator is obj:
+                if self._read:
+                    raise MalInvalidArgumentException(self, "iterator already read")
+                self._read = True
+        return MalLazySeq(expression_from_native(x, policy) for x in iterator)
+
     def dot(self, attr: str, value: Optional[MalExpression]) -> MalExpression:
-        if self._restrictions:
-            attrs = self._restrictions.get(type(self._python_native))
-            if not attrs or attr not in attrs:
+        policy = self._restrictions
+        if type(policy) is not AccessPolicy:
+            policy = self._restrictions = AccessPolicy.of(policy)
+        if policy.restricted:
+            cls = type(self._python_native)
+            allowed = policy.allowed_by_type.get(cls)
+            if allowed is None:
+                allowed = policy.allowed(cls)
+            if attr not in allowed:
                 raise MalInvalidArgumentException(
                     self, f'Access restricted to attribute "{attr}"'
                 )
@@ -87,7 +208,7 @@ class MalPythonObject(MalExpression):
                 return MalNil()
             else:
                 return expression_from_native(
-                    getattr(self._python_native, attr, None), self._restrictions
+                    getattr(self._python_native, attr, None), policy
                 )
         except MalException:
             raise
@@ -135,10 +256,144 @@ class MalKeyword(MalExpression):
         return hash(self._value)
 
 
+class MalStringView(MalString):
+    """A string decoded from a buffer, such as a memory mapped file,
+    only when its value is first needed."""
+
+    def __init__(self, buffer: Any, encoding: str) -> None:
+        self._buffer: Any = buffer
+        self._encoding = encoding
+        self._decoded: Optional[str] = None
+
+    @property  # type: ignore
+    def _value(self) -> str:
+        if self._decoded is None:
+            self._decoded = str(self._buffer, self._encoding)
+            self._buffer = None
+        return self._decoded
+
+    def lines(self) -> Iterator[str]:
+        """Yield the lines of the string, decoding a line at a time if the
+        encoding allows the buffer to be split on newline bytes."""
+        buffer = self._buffer
+        if buffer is None or "\n".encode(self._encoding) != b"\n":
+            yield from self._value.splitlines(keepends=True)
+            return
+        start = 0
+        while start < len(buffer):
+            end = buffer.find(b"\n", start) + 1 or len(buffer)
+            yield str(buffer[start:end], self._encoding)
+            start = end
+
+    def __eq__(self, other):
+        if isinstance(other, MalString):
+            return self.native() == other.native()
+        return False
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+class MalBytes(MalExpression):
+    """Immutable bytes backed by a memoryview of a bytes-like object.
+
+    Read-only buffers, such as bytes and read-only mmaps, are shared,
+    so slicing does not copy them. Writable or non-contiguous buffers
+    are copied, so the value cannot change after it is made."""
+
+    def __init__(self, data: Any) -> None:
+        view = memoryview(data)
+        if view.readonly and view.c_contiguous:
+            self._view = view.cast("B")
+        else:
+            self._view = memoryview(view.tobytes())
+
+    def __eq__(self, other):
+        if isinstance(other, MalBytes):
+            return self._view == other._view
+        return False
+
+    def __hash__(self):
+        # The view is read-only, so it hashes like the bytes it holds
+        return hash(self._view)
+
+    def readable_str(self) -> str:
+        # Reads back as an equal value
+        return '(hex->bytes "' + self._view.hex() + '")'
+
+    def native(self) -> memoryview:
+        return self._view
+
+
+class MalPattern(MalExpression):
+    def __init__(self, pattern: Pattern[str]) -> None:
+        self._pattern = pattern
+
+    def readable_str(self) -> str:
+        return '#"' + self._pattern.pattern.replace('"', '\\"') + '"'
+
+    def native(self) -> Pattern[str]:
+        return self._pattern
+
+
+class SourcePosition(NamedTuple):
+    source: str
+    line: int
+    column: int
+
+    def __str__(self) -> str:
+        return f"{self.source}:{self.line}:{self.column}"
+
+
+class SourceMap:
+    """Finds the line and column of character offsets in a source.
+
+    Line starts are found from the text on first use,
+    or added a line at a time by the reader."""
+
+    def __init__(
+        self,
+        source: str,
+        text: Optional[str] = None,
+        line_starts: Optional[List[int]] = None,
+    ):
+        self.source = source
+        self._text = text
+        self._line_starts: List[int] = [] if line_starts is None else line_starts
+
+    def add_line(self, offset: int) -> None:
+        self._line_starts.append(offset)
+
+    @property
+    def line_starts(self) -> List[int]:
+        if self._text is not None:
+            line_starts = [0] + [m.end() for m in re.finditer("\n", self._text)]
+            self._line_starts = line_starts
+            self._text = None
+        return self._line_starts
+
+    def position(self, offset: int) -> SourcePosition:
+        line_starts = self.line_starts
+        line = bisect.bisect_right(line_starts, offset)
+        column = offset - line_starts[line - 1] + 1
+        return SourcePosition(self.source, line, column)
+
+
 class MalMeta(metaclass=abc.ABCMeta):
+    # Set by the reader when reading with a source name, so forms
+    # only pay for positions when they are wanted
+    _source_map: Optional[SourceMap] = None
+    _source_offset = 0
+
     def __init__(self, *args, **kwargs):
         self._meta: Optional[MalExpression] = None
 
+    @property
+    def position(self) -> Optional[SourcePosition]:
+        if self._source_map is None:
+            return None
+        return self._source_map.position(self._source_offset)
+
     @abc.abstractmethod
     def copy(self) -> MalMeta:
         pass
@@ -178,6 +433,151 @@ class MalList(MalExpression, MalMeta):
         return self._values
 
 
+LAZY_CHUNK_SIZE = 32
+
+
+class _Chunk:
+    """Items read from the iterator of a lazy seq, linked to the next chunk."""
+
+    __slots__ = ("items", "_next", "_iterator", "_lock")
+
+    def __init__(
+        self,
+        items: List[MalExpression],
+        iterator: Optional[Iterator[MalExpression]],
+        lock: threading.Lock,
+    ) -> None:
+        self.items = items
+        self._next: Optional[_Chunk] = None
+        self._iterator = iterator
+        self._lock = lock
+
+    def next(self) -> Optional[_Chunk]:
+        if self._iterator is not None:
+            with self._lock:
+                iterator = self._iterator
+                if iterator is not None:
+                    items = list(itertools.islice(iterator, LAZY_CHUNK_SIZE))
+                    if items:
+                        self._next = _Chunk(items, iterator, self._lock)
+                    self._iterator = None
+        return self._next
+
+
+def _iterate(chunk: Optional[_Chunk], index: int) -> Iterator[MalExpression]:
+    while chunk is not None:
+        yield from itertools.islice(chunk.items, index, None)
+        chunk = chunk.next()
+        index = 0
+
+
+class MalLazySeq(MalList):
+    """A list whose items are read from an iterator as they are needed,
+    LAZY_CHUNK_SIZE at a time.
+
+    Each item is read once and shared by the seq and its rests, so single
+    pass iterators are safe. Chunks before the oldest seq still referenced
+    can be garbage collected. native() reads all remaining items."""
+
+    def __init__(self, values: Iterable[MalExpression]) -> None:
+        MalMeta.__init__(self)
+        self._chunk: Optional[_Chunk] = _Chunk([], iter(values), threading.Lock())
+        self._index = 0
+        self._realized: Optional[List[MalExpression]] = None
+
+    @classmethod
+    def _at(cls, chunk: Optional[_Chunk], index: int) -> MalLazySeq:
+        seq = cls.__new__(cls)
+        MalMeta.__init__(seq)
+        seq._chunk = chunk
+        seq._index = index
+        seq._realized = None
+        return seq
+
+    def _head(self) -> Tuple[Optional[_Chunk], int]:
+        chunk, index = self._chunk, self._index
+        while chunk is not None and index >= len(chunk.items):
+            chunk, index = chunk.next(), 0
+        self._chunk, self._index = chunk, index
+        return chunk, index
+
+    def first(self) -> Optional[MalExpression]:
+        chunk, index = self._head()
+        return None if chunk is None else chunk.items[index]
+
+    def rest(self) -> MalLazySeq:
+        chunk, index = self._head()
+        return self._at(chunk, index + 1)
+
+    def empty(self) -> bool:
+        return self._head()[0] is None
+
+    def iterate(self) -> Iterator[MalExpression]:
+        """Iterate over the items without keeping them all."""
+        return _iterate(*self._head())
+
+    @property  # type: ignore
+    def _values(self) -> List[MalExpression]:
+        if self._realized is None:
+            self._realized = list(self.iterate())
+        return self._realized
+
+    def copy(self) -> MalLazySeq:
+        seq = self._at(self._chunk, self._index)
+        seq._realized = self._realized
+        return seq
+
+
+class MalSequenceView(MalList):
+    """A read-only list of the items of a Python sequence, from start.
+
+    The sequence is not copied, items are converted when they are read
+    and rest shares the sequence. native() converts all the items."""
+
+    def __init__(
+        self, sequence: Sequence[Any], policy: AccessPolicy, start: int = 0
+    ) -> None:
+        MalMeta.__init__(self)
+        self._sequence = sequence
+        self._policy = policy
+        self._start = start
+        self._realized: Optional[List[MalExpression]] = None
+
+    def count(self) -> int:
+        return max(len(self._sequence) - self._start, 0)
+
+    def nth(self, index: int) -> MalExpression:
+        if index < 0:
+            index += self.count()
+        if not 0 <= index < self.count():
+            raise MalIndexError(index)
+        return expression_from_native(self._sequence[self._start + index], self._policy)
+
+    def first(self) -> Optional[MalExpression]:
+        return self.nth(0) if self.count() else None
+
+    def rest(self) -> MalSequenceView:
+        return MalSequenceView(
+            self._sequence, self._policy, min(self._start + 1, len(self._sequence))
+        )
+
+    def iterate(self) -> Iterator[MalExpression]:
+        policy = self._policy
+        for x in itertools.islice(self._sequence, self._start, None):
+            yield expression_from_native(x, policy)
+
+    @property  # type: ignore
+    def _values(self) -> List[MalExpression]:
+        if self._realized is None:
+            self._realized = list(self.iterate())
+        return self._realized
+
+    def copy(self) -> MalSequenceView:
+        view = MalSequenceView(self._sequence, self._policy, self._start)
+        view._realized = self._realized
+        return view
+
+
 class MalSymbol(MalExpression):
     def __init__(self, value: str) -> None:
         if not isinstance(value, str):
@@ -204,8 +604,15 @@ class MalException(MalExpression, Exception):
     def readable_str(self) -> str:
         return str(self._value)
 
-    def readable_backtrace(self) -> str:
-        return "\n".join(str(f) for f in self.backtrace)
+    def readable_backtrace(
+        self, print_form: Callable[[MalExpression], str] = str
+    ) -> str:
+        return "\n".join(
+            f"{f.position}: {print_form(f)}"
+            if isinstance(f, MalMeta) and f.position is not None
+            else print_form(f)
+            for f in self.backtrace
+        )
 
     def native(self) -> MalExpression:
         return self._value
@@ -231,11 +638,18 @@ class MalUnknownTypeException(MalException):
         super().__init__(MalString(message))
 
 
+def _print_argument(arg: MalExpression) -> str:
+    # printer imports this module, so it is imported when first needed
+    from . import printer
+
+    # The argument may be any value, so its printed size is limited
+    return printer.pr_str(arg, max_chars=printer.ARGUMENT_MAX_CHARS)
+
+
 class MalInvalidArgumentException(MalException):
     def __init__(self, arg: MalExpression, reason: str) -> None:
-        super().__init__(
-            MalString(arg.readable_str() + ": invalid argument: " + reason)
-        )
+        text = _print_argument(arg)
+        super().__init__(MalString(text + ": invalid argument: " + reason))
 
 
 class MalUnknownSymbolException(MalException):
@@ -278,14 +692,22 @@ class MalFunction(MalExpression, MalMeta):
 
 
 class MalFunctionCompiled(MalFunction):
+    """A function implemented in Python.
+
+    With owns_args, native_function may change the list of arguments
+    it is given, for example to release a lazy seq it is reading."""
+
     def __init__(
-        self, native_function: Callable[[List[MalExpression]], MalExpression]
+        self,
+        native_function: Callable[[List[MalExpression]], MalExpression],
+        owns_args: bool = False,
     ) -> None:
         super().__init__()
         self._native_function = native_function
+        self._owns_args = owns_args
 
     def copy(self) -> MalFunctionCompiled:
-        f = self.__class__(self.native())
+        f = self.__class__(self.native(), self._owns_args)
         if self.is_macro():
             f.make_macro()
         return f
@@ -295,9 +717,41 @@ class MalFunctionCompiled(MalFunction):
 
     def call(self, args: List[MalExpression]) -> MalExpression:
         # print("CALL: " + str([str(arg) for arg in args]))
+        if self._owns_args:
+            args = list(args)
+        return self._native_function(args)
+
+    def call_owned(self, args: List[MalExpression]) -> MalExpression:
+        """Call with a list of arguments made for this call, which the
+        caller hands over and does not use again."""
         return self._native_function(args)
 
 
+class MalFunctionMemoized(MalFunctionCompiled):
+    def __init__(self, function: MalFunction, cache: Cache) -> None:
+        super().__init__(self._call_memoized)
+        self._function = function
+        self._cache = cache
+
+    def copy(self) -> MalFunctionMemoized:
+        f = self.__class__(self._function, self._cache)
+        if self.is_macro():
+            f.make_macro()
+        return f
+
+    @property
+    def cache(self) -> Cache:
+        return self._cache
+
+    def _call_memoized(self, args: List[MalExpression]) -> MalExpression:
+        key = tuple(hash_key(a) for a in args)
+        result = self._cache.get(key)
+        if result is Cache.MISSING:
+            result = self._function.call(args)
+            self._cache.put(key, result)
+        return result
+
+
 class MalFunctionRaw(MalFunction, MalMeta):
     def __init__(
         self,
@@ -345,11 +799,20 @@ class MalFunctionRaw(MalFunction, MalMeta):
 
 
 class MalFunctionPython(MalFunction, MalPythonObject):
+    # How calls are made, worked out on the first call
+    _plan: Optional[Callable[[List[MalExpression]], MalExpression]] = None
+
     def __init__(
-        self, python_function: Callable, restrictions: Optional[Restrictions]
+        self,
+        python_function: Callable,
+        restrictions: Union[Restrictions, AccessPolicy, None],
     ) -> None:
         super().__init__(native=python_function, restrictions=restrictions)
 
+    @property
+    def convention(self) -> str:
+        return getattr(self._python_native, CONVENTION_ATTRIBUTE, NATIVE)
+
     def copy(self) -> MalFunctionPython:
         f = self.__class__(self.native(), self.restrictions)
         if self.is_macro():
@@ -360,32 +823,55 @@ class MalFunctionPython(MalFunction, MalPythonObject):
         return self._python_native
 
     def call(self, mal_args: List[MalExpression]) -> MalExpression:
-        args = []
-        kwargs: Dict[str, Any] = {}
-        args_iter = iter(mal_args)
-        for a in args_iter:
-            if isinstance(a, MalKeyword):
-                try:
-                    v = next(args_iter)
-                except StopIteration:
-                    raise MalInvalidArgumentException(
-                        a, "expected value following keyword"
-                    )
-                k = a.native()
-                if k in kwargs:
-                    raise MalInvalidArgumentException(a, "duplicate keyword")
-                kwargs[k] = expression_to_native(v)
-            else:
-                args.append(expression_to_native(a))
+        plan = self._plan
+        if plan is None:
+            plan = self._plan = self._make_plan()
         try:
-            return expression_from_native(
-                self._python_native(*args, **kwargs), self._restrictions,
-            )
+            return plan(mal_args)
         except MalException:
             raise
         except Exception as e:
             raise MalException(MalString(f"'{repr(e)}' raised from python")) from e
 
+    def _make_plan(self) -> Callable[[List[MalExpression]], MalExpression]:
+        func = self._python_native
+        convention = self.convention
+        if convention == MAL:
+            return func
+        convert = expression_to_view if convention == VIEWS else expression_to_native
+        policy = AccessPolicy.of(self._restrictions)
+
+        def plan(mal_args: List[MalExpression]) -> MalExpression:
+            if MalKeyword not in map(type, mal_args):
+                result = func(*[convert(a) for a in mal_args])
+            else:
+                args, kwargs = _keyword_args(mal_args, convert)
+                result = func(*args, **kwargs)
+            return expression_from_native(result, policy)
+
+        return plan
+
+
+def _keyword_args(
+    mal_args: List[MalExpression], convert: Callable[[MalExpression], Any]
+) -> Tuple[List[Any], Dict[str, Any]]:
+    args = []
+    kwargs: Dict[str, Any] = {}
+    args_iter = iter(mal_args)
+    for a in args_iter:
+        if isinstance(a, MalKeyword):
+            try:
+                v = next(args_iter)
+            except StopIteration:
+                raise MalInvalidArgumentException(a, "expected value following keyword")
+            k = a.native()
+            if k in kwargs:
+                raise MalInvalidArgumentException(a, "duplicate keyword")
+            kwargs[k] = convert(v)
+        else:
+            args.append(convert(a))
+    return args, kwargs
+
 
 class MalFloat(MalExpression):
     def __init__(self, value: float) -> None:
@@ -465,6 +951,72 @@ class MalHash_map(MalExpression, MalMeta):
         return self._dict
 
 
+_MISSING = object()
+
+
+class MalMappingView(MalHash_map):
+    """A read-only hash-map of a Python mapping with string keys.
+
+    The mapping is not copied and values are converted when they are read.
+    native() converts all the values. As with NativeMappingView, a keyword
+    looks up the string key with its name. Reading the keys of a mapping
+    with other keys raises."""
+
+    def __init__(self, mapping: Mapping[Any, Any], policy: AccessPolicy) -> None:
+        MalMeta.__init__(self)
+        self._mapping = mapping
+        self._policy = policy
+        self._realized: Optional[HashMapDict] = None
+
+    def __eq__(self, other):
+        if isinstance(other, MalHash_map):
+            return self.native() == other.native()
+        return False
+
+    def count(self) -> int:
+        return len(self._mapping)
+
+    def get(self, key: MalExpression) -> Optional[MalExpression]:
+        if not isinstance(key, (MalString, MalKeyword)):
+            return None
+        value = self._mapping.get(key.native(), _MISSING)
+        if value is _MISSING:
+            return None
+        return expression_from_native(value, self._policy)
+
+    def contains(self, key: MalExpression) -> bool:
+        return (
+            isinstance(key, (MalString, MalKeyword)) and key.native() in self._mapping
+        )
+
+    def keys(self) -> List[MalString]:
+        keys: List[MalString] = []
+        for key in self._mapping:
+            if not isinstance(key, str):
+                raise MalInvalidArgumentException(
+                    MalPythonObject(key), "hash-map key not a string"
+                )
+            keys.append(MalString(key))
+        return keys
+
+    def items(self) -> Iterator[Tuple[MalString, MalExpression]]:
+        """Iterate over the entries without keeping them all."""
+        mapping, policy = self._mapping, self._policy
+        for key in self.keys():
+            yield key, expression_from_native(mapping[key.native()], policy)
+
+    @property  # type: ignore
+    def _dict(self) -> HashMapDict:
+        if self._realized is None:
+            self._realized = dict(self.items())
+        return self._realized
+
+    def copy(self) -> MalMappingView:
+        view = MalMappingView(self._mapping, self._policy)
+        view._realized = self._realized
+        return view
+
+
 class MalNil(MalExpression):
     def __init__(self) -> None:
         pass
@@ -512,14 +1064,34 @@ class MalAtom(MalExpression):
 
 
 def expression_from_native(
-    obj: Any, restrictions: Optional[Restrictions]
+    obj: Any, restrictions: Union[Restrictions, AccessPolicy, None]
 ) -> MalExpression:
+    if type(restrictions) is AccessPolicy and restrictions.shares_wrappers:
+        return restrictions.wrap(obj)
     if callable(obj):
         return MalFunctionPython(obj, restrictions)
     return MalPythonObject(obj, restrictions)
 
 
+def expression_from_python(
+    obj: Any, restrictions: Union[Restrictions, AccessPolicy, None]
+) -> MalExpression:
+    """Convert obj as $ converts a Python object, with str, numbers, bool and
+    None as Mal values, collections as views and Mal values unchanged."""
+    convert = _PRIMITIVES.get(type(obj))
+    if convert is not None:
+        return convert(obj)
+    if isinstance(obj, MalExpression):
+        return obj
+    expr = expression_from_native(obj, restrictions)
+    if type(expr) is MalPythonObject:
+        return expr.to_expression()
+    return expr
+
+
 def expression_to_native(expr: MalExpression) -> Any:
+    if type(expr) in _SCALARS:
+        return expr.native()
     if isinstance(expr, (MalList, MalVector)):
         return [expression_to_native(e) for e in expr.native()]
     if isinstance(expr, MalHash_map):
@@ -528,3 +1100,163 @@ def expression_to_native(expr: MalExpression) -> Any:
             for k, v in expr.native().items()
         }
     return expr.native()
+
+
+def expression_to_view(expr: MalExpression) -> Any:
+    """Like expression_to_native, but collections become read-only views
+    rather than copies, and views of Python collections are unwrapped."""
+    if type(expr) in _SCALARS:
+        return expr.native()
+    if isinstance(expr, MalSequenceView) and expr._start == 0:
+        return expr._sequence
+    if isinstance(expr, MalMappingView):
+        return expr._mapping
+    if isinstance(expr, (MalList, MalVector)):
+        return NativeSequenceView(expr.native())
+    if isinstance(expr, MalHash_map):
+        return NativeMappingView(expr.native())
+    return expr.native()
+
+
+class NativeSequenceView(collections.abc.Sequence):
+    """A Mal list or vector as a read-only Python sequence."""
+
+    def __init__(self, values: List[MalExpression]) -> None:
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NativeSequenceView(self._values[index])
+        return expression_to_view(self._values[index])
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class NativeMappingView(collections.abc.Mapping):
+    """A Mal hash-map as a read-only Python mapping with str keys.
+
+    A string key and a keyword with the same name are one key,
+    whose value is the string key's."""
+
+    def __init__(self, values: HashMapDict) -> None:
+        self._values = values
+        self._keys: Optional[List[str]] = None
+
+    def _key_list(self) -> List[str]:
+        if self._keys is None:
+            self._keys = list(dict.fromkeys(k.native() for k in self._values))
+        return self._keys
+
+    def __len__(self) -> int:
+        return len(self._key_list())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._key_list())
+
+    def __getitem__(self, key: str) -> Any:
+        if isinstance(key, str):
+            value = self._values.get(MalString(key))
+            if value is None:
+                value = self._values.get(MalKeyword(key))
+            if value is not None:
+                return expression_to_view(value)
+        raise KeyError(key)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+# Calling conventions of Python functions, see calling_convention
+NATIVE = "native"
+VIEWS = "views"
+MAL = "mal"
+CONVENTIONS = (NATIVE, VIEWS, MAL)
+CONVENTION_ATTRIBUTE = "__mal_convention__"
+
+F = TypeVar("F", bound=Callable)
+
+
+def calling_convention(convention: str) -> Callable[[F], F]:
+    """Decorator choosing how Mal calls a Python function.
+
+    NATIVE, the default, converts arguments with expression_to_native.
+    VIEWS passes lists, vectors and hash-maps as read-only views instead
+    of copies. MAL calls the function with the list of Mal arguments
+    unconverted, like a core function, and it must return a MalExpression."""
+    if convention not in CONVENTIONS:
+        raise ValueError(f"unknown calling convention {convention!r}")
+
+    def decorate(func: F) -> F:
+        setattr(func, CONVENTION_ATTRIBUTE, convention)
+        return func
+
+    return decorate
+
+
+_BYTES = (bytes, bytearray, memoryview)
+_SEQ_LOCK = threading.Lock()
+
+_PRIMITIVES: Dict[type, Callable[[Any], MalExpression]] = {
+    str: MalString,
+    int: MalInt,
+    float: MalFloat,
+    bool: MalBoolean,
+    bytes: MalBytes,
+    type(None): lambda _: MalNil(),
+}
+
+
+# Types whose native() is already the Python value
+_SCALARS = frozenset(
+    (MalString, MalKeyword, MalSymbol, MalInt, MalFloat, MalBoolean, MalNil)
+)
+
+
+class _Identity:
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and self.obj is other.obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+
+def hash_key(expr: MalExpression) -> Hashable:
+    """Return a hashable key that is equal for structurally equal expressions.
+
+    Lists and vectors share keys, as they compare equal. Values without
+    structural equality (atoms, functions) are keyed by identity."""
+    if isinstance(expr, (MalList, MalVector)):
+        return (MalList, tuple(hash_key(x) for x in expr.native()))
+    if isinstance(expr, MalHash_map):
+        return (
+            MalHash_map,
+            frozenset((hash_key(k), hash_key(v)) for k, v in expr.native().items()),
+        )
+    if isinstance(expr, MalString):
+        # Including string views
+        return (MalString, expr.native())
+    if isinstance(expr, MalBytes):
+        return (MalBytes, expr.native().tobytes())
+    if isinstance(
+        expr, (MalKeyword, MalSymbol, MalInt, MalFloat, MalBoolean, MalPattern),
+    ):
+        return (type(expr), expr.native())
+    if isinstance(expr, MalNil):
+        return MalNil
+    if isinstance(expr, MalPythonObject) and not isinstance(expr, MalFunction):
+        try:
+            hash(expr.native())
+        except TypeError:
+            pass
+        else:
+            return (MalPythonObject, expr.native())
+    return _Identity(expr)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    TYPE_CHECKING,
+)
+from pathlib import Path
+import hashlib
+import os
+
+from . import compiled
+from . import reader
+from .cache import Cache
+from .mal_types import (
+    MalExpression,
+    MalList,
+    MalNil,
+    MalSymbol,
+    MalString,
+    SourceMap,
+    MalInvalidArgumentException,
+    MalSyntaxException,
+    MalException,
+)
+
+if TYPE_CHECKING:
+    from .env import Env
+
+MODULE_CACHE_SIZE = 512
+# Largest file load-file keeps the forms of to compile
+COMPILE_MAX_SIZE = 8 * 1024 * 1024
+
+DO = MalSymbol("do")
+
+
+class ModuleCache:
+    """Process-wide cache of parsed module forms.
+
+    Entries are found by path, mtime and size without reading the file,
+    or by the hash of the file contents when the file has been touched
+    or the same source lives at another path.
+    Otherwise compiled forms are loaded from a .malc file if it is current,
+    and parsed forms are written to one when write_compiled is set."""
+
+    def __init__(self, max_size: int = MODULE_CACHE_SIZE, write_compiled: bool = True):
+        self._by_stat = Cache(max_size=max_size)
+        self._by_digest = Cache(max_size=max_size)
+        self.write_compiled = write_compiled
+
+    def forms(self, path: Path) -> MalExpression:
+        st = path.stat()
+        stat_key = (str(path), st.st_mtime_ns, st.st_size)
+        forms = self._by_stat.get(stat_key)
+        if forms is Cache.MISSING:
+            forms = self._load(path, st)
+            self._by_stat.put(stat_key, forms)
+        return forms
+
+    def _load(self, path: Path, st: os.stat_result) -> MalExpression:
+        precompiled = compiled.load(path, st, refresh=self.write_compiled)
+        if precompiled is not None:
+            return MalList([DO] + precompiled + [MalNil()])
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).digest()
+        forms = self._by_digest.get(digest)
+        if forms is Cache.MISSING:
+            scanner = reader.Scanner(data.decode("utf-8"), str(path))
+            parsed = list(scanner.iter_forms())
+            self.save_compiled(path, st, parsed, scanner.source_map, digest)
+            forms = MalList([DO] + parsed + [MalNil()])
+            self._by_digest.put(digest, forms)
+        return forms
+
+    def compiled_forms(
+        self, path: Path, st: os.stat_result, source: Optional[str] = None
+    ) -> Optional[List[MalExpression]]:
+        return compiled.load(path, st, source, self.write_compiled)
+
+    def save_compiled(
+        self,
+        path: Path,
+        st: os.stat_result,
+        forms: List[MalExpression],
+        source_map: Optional[SourceMap],
+        digest: Optional[bytes] = None,
+    ) -> None:
+        """Write forms read from path, unless it has changed since st."""
+        if not self.write_compiled:
+            return
+        try:
+            if digest is None:
+                digest = compiled.file_digest(path)
+                current = path.stat()
+                if current.st_mtime_ns != st.st_mtime_ns:
+                    return
+                if current.st_size != st.st_size:
+                    return
+        except OSError:
+            return
+        line_starts = None if source_map is None else source_map.line_starts
+        compiled.dump(path, st, digest, forms, line_starts)
+
+    def clear(self) -> None:
+        self._by_stat.clear()
+        self._by_digest.clear()
+
+
+module_cache = ModuleCache()
+
+
+class ModuleLoader:
+    """Loads each module at most once into an environment."""
+
+    def __init__(
+        self,
+        env: Env,
+        evaluate: Callable[[MalExpression, Env], MalExpression],
+        cache: ModuleCache = module_cache,
+    ):
+        self._env = env
+        self._evaluate = evaluate
+        self._cache = cache
+        self._resolved: Dict[Tuple[str, str], Path] = {}
+        self._loaded: Set[Path] = set()
+
+    def resolve(self, name: str) -> Path:
+        key = (os.getcwd(), name)
+        path = self._resolved.get(key)
+        if path is None:
+            path = self._resolved[key] = Path(name).resolve()
+        return path
+
+    def require(self, args: List[MalExpression]) -> MalExpression:
+        if not args:
+            raise MalSyntaxException("require requires at least one module")
+        for name in args:
+            if not isinstance(name, MalString):
+                raise MalInvalidArgumentException(name, "not a string")
+            path = self.resolve(name.native())
+            if path in self._loaded:
+                continue
+            # Mark loaded first, so circular requires terminate
+            self._loaded.add(path)
+            try:
+                forms = self._cache.forms(path)
+                self._evaluate(forms, self._env)
+            except OSError as e:
+                self._loaded.discard(path)
+                raise MalException(MalString(f"'{repr(e)}' raised from python")) from e
+            except BaseException:
+                self._loaded.discard(path)
+                raise
+        return MalNil()
+
+    def _compiling(
+        self, f: TextIO, path: Path, st: os.stat_result, source: str
+    ) -> Iterator[MalExpression]:
+        """Yield the forms read from f, then compile them if all were read."""
+        scanner = reader.Scanner(f, source)
+        # Larger files are streamed without keeping their forms
+        keep = self._cache.write_compiled and st.st_size <= COMPILE_MAX_SIZE
+        read: List[MalExpression] = []
+        for form in scanner.iter_forms():
+            if keep:
+                read.append(form)
+            yield form
+        if keep:
+            self._cache.save_compiled(path, st, read, scanner.source_map)
+
+    def load_file(self, args: List[MalExpression]) -> MalExpression:
+        """Evaluate each top level form of a file as soon as it is read."""
+        if len(args) != 1 or not isinstance(args[0], MalString):
+            raise MalSyntaxException("load-file requires a file name")
+        filename = args[0].native()
+        path = Path(filename)
+        f: Optional[TextIO] = None
+        try:
+            st = path.stat()
+            forms: Optional[Iterable[MalExpression]]
+            forms = self._cache.compiled_forms(path, st, filename)
+            if forms is None:
+                f = open(filename, "r", encoding="utf-8")
+                forms = self._compiling(f, path, st, filename)
+        except OSError as e:
+            raise MalException(MalString(f"'{repr(e)}' raised from python")) from e
+        count = 1
+        try:
+            for form in forms:
+                self._evaluate(form, self._env)
+                count += 1
+        except MalException as e:
+            e.backtrace.append(MalString(f"{filename}: top level form {count}"))
+            raise
+        finally:
+            # Reading stops early if a form raises
+            if f is not None:
+                f.close()
+        return MalNil()
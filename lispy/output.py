@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import List, Optional, TextIO
+import io
+import threading
+
+from . import core
+from .mal_types import MalExecutionLimitError
+
+
+class OutputSink:
+    """Destination for the lines printed by prn, println, pprint and the REPL.
+
+    Lines are written to stream, or passed one at a time to core.python_print
+    when there is no stream. Up to buffer_size characters are held before
+    being written in a single call, and max_bytes limits the UTF-8 encoded
+    size of the output until the quota is reset."""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        buffer_size: int = 0,
+        max_bytes: Optional[int] = None,
+    ):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        self._lines: List[str] = []
+        self._buffered = 0
+        # pmap may print from several threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def capture(cls, max_bytes: Optional[int] = None) -> OutputSink:
+        """Create a sink that keeps its output in memory, see getvalue."""
+        return cls(io.StringIO(), max_bytes=max_bytes)
+
+    def write_line(self, line: str) -> None:
+        with self._lock:
+            if self.max_bytes is not None:
+                size = len(line.encode("utf-8")) + 1
+                if self.bytes_written + size > self.max_bytes:
+                    raise MalExecutionLimitError(
+                        f"output limit of {self.max_bytes} bytes exceeded"
+                    )
+                self.bytes_written += size
+            self._lines.append(line)
+            self._buffered += len(line) + 1
+            if self._buffered > self.buffer_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def reset_quota(self) -> None:
+        with self._lock:
+            self.bytes_written = 0
+
+    def getvalue(self) -> str:
+        """Return the output captured so far, for sinks writing to a StringIO."""
+        if not isinstance(self.stream, io.StringIO):
+            raise ValueError("output is not being captured")
+        self.flush()
+        return self.stream.getvalue()
+
+    def _flush(self) -> None:
+        if not self._lines:
+            return
+        lines = self._lines
+        self._lines = []
+        self._buffered = 0
+        if self.stream is None:
+            for line in lines:
+                core.python_print(line)
+        else:
+            self.stream.write("\n".join(lines) + "\n")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterator, List, Optional
+from concurrent import futures
+import threading
+
+from .core import sequence_items
+from .mal_types import (
+    MAL,
+    MalExpression,
+    MalException,
+    MalFunction,
+    MalFunctionPython,
+    MalInvalidArgumentException,
+    MalList,
+    MalString,
+    MalSyntaxException,
+    expression_from_native,
+    expression_to_native,
+)
+
+THREAD = "thread"
+PROCESS = "process"
+
+# Set in threads running pool work, so nested maps do not wait on the pool
+_worker = threading.local()
+
+
+class WorkerPool:
+    """Configuration for the executor used by pmap and pcalls.
+
+    The executor is not created until work is first submitted.
+    Process pools can only run injected Python functions,
+    since Mal functions close over their environment and cannot be pickled."""
+
+    def __init__(
+        self, kind: str = THREAD, max_workers: Optional[int] = None, chunksize: int = 1
+    ):
+        if kind not in (THREAD, PROCESS):
+            raise ValueError(f"unknown worker pool kind {kind!r}")
+        if chunksize < 1:
+            raise ValueError("chunksize must be positive")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self._executor: Optional[futures.Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> futures.Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == PROCESS:
+                    self._executor = futures.ProcessPoolExecutor(self.max_workers)
+                else:
+                    self._executor = futures.ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="lispy"
+                    )
+            return self._executor
+
+    def map(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply func to each item in the pool, returning results in order."""
+        if not items:
+            return []
+        if self.kind == PROCESS:
+            return _collect(self.executor.map(func, items, chunksize=self.chunksize))
+        if getattr(_worker, "active", False):
+            # Every worker could block waiting on work queued behind it,
+            # so a nested map runs inline on the worker that started it
+            return _collect(func(x) for x in items)
+        # ThreadPoolExecutor ignores chunksize, so batch the items ourselves
+        size = self.chunksize
+        chunks: List[List[Any]] = []
+        for i in range(0, len(items), size):
+            end = i + size
+            chunks.append(items[i:end])
+        results = self.executor.map(lambda chunk: _run_chunk(func, chunk), chunks)
+        return [r for chunk in _collect(results) for r in chunk]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+def _run_chunk(func: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    _worker.active = True
+    try:
+        return [func(x) for x in chunk]
+    finally:
+        _worker.active = False
+
+
+def _collect(results: Iterator[Any]) -> List[Any]:
+    try:
+        return list(results)
+    except MalException:
+        raise
+    except Exception as e:
+        raise MalException(MalString(f"'{repr(e)}' raised from python")) from e
+
+
+def _map_function(
+    pool: WorkerPool, func: MalExpression, items: List[MalExpression]
+) -> List[MalExpression]:
+    if not isinstance(func, MalFunction):
+        raise MalInvalidArgumentException(func, "not a function")
+    if pool.kind != PROCESS:
+        return pool.map(lambda x: func.call([x]), items)
+    if not isinstance(func, MalFunctionPython):
+        raise MalInvalidArgumentException(func, "not a python function")
+    if func.convention == MAL:
+        return pool.map(func.native(), [[x] for x in items])
+    # Views would be copied to the worker processes anyway
+    results = pool.map(func.native(), [expression_to_native(x) for x in items])
+    return [expression_from_native(r, func.restrictions) for r in results]
+
+
+def pmap(pool: WorkerPool, args: List[MalExpression]) -> MalExpression:
+    if len(args) != 2:
+        raise MalSyntaxException("pmap requires a function and a sequence")
+    return MalList(_map_function(pool, args[0], sequence_items(args[1])))
+
+
+def pcalls(pool: WorkerPool, args: List[MalExpression]) -> MalExpression:
+    funcs: List[MalFunction] = []
+    for func in args:
+        if not isinstance(func, MalFunction):
+            raise MalInvalidArgumentException(func, "not a function")
+        funcs.append(func)
+    if pool.kind != PROCESS:
+        return MalList(pool.map(lambda f: f.call([]), funcs))
+    python_funcs: List[MalFunctionPython] = []
+    for func in funcs:
+        if not isinstance(func, MalFunctionPython):
+            raise MalInvalidArgumentException(func, "not a python function")
+        python_funcs.append(func)
+    results = pool.map(_call_native, [f.native() for f in python_funcs])
+    return MalList(
+        [
+            expression_from_native(r, f.restrictions)
+            for r, f in zip(results, python_funcs)
+        ]
+    )
+
+
+def _call_native(func: Callable[[], Any]) -> Any:
+    return func()
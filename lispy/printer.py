@@ -0,0 +1,275 @@
+from __future__ import annotations
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+import io
+import itertools
+
+from .mal_types import (
+    MalExpression,
+    MalAtom,
+    MalBytes,
+    MalHash_map,
+    MalLazySeq,
+    MalMappingView,
+    MalSequenceView,
+    MalList,
+    MalString,
+    MalVector,
+)
+
+DEFAULT_WIDTH = 80
+# Longest printed argument in an invalid argument message
+ARGUMENT_MAX_CHARS = 1000
+
+
+def _brackets(value: MalExpression) -> Optional[Tuple[str, str]]:
+    if isinstance(value, MalList):
+        return "(", ")"
+    if isinstance(value, MalVector):
+        return "[", "]"
+    if isinstance(value, MalHash_map):
+        return "{", "}"
+    if isinstance(value, MalAtom):
+        return "(atom ", ")"
+    return None
+
+
+def _children(value: MalExpression) -> Iterable[MalExpression]:
+    # Views and lazy seqs are read as they are printed
+    if isinstance(value, MalMappingView):
+        return itertools.chain.from_iterable(value.items())
+    if isinstance(value, MalHash_map):
+        return itertools.chain.from_iterable(value.native().items())
+    if isinstance(value, MalAtom):
+        return (value.native(),)
+    if isinstance(value, (MalLazySeq, MalSequenceView)):
+        return value.iterate()
+    return value.native()
+
+
+def tokens(
+    value: MalExpression,
+    readably: bool = True,
+    max_depth: Optional[int] = None,
+    max_length: Optional[int] = None,
+    max_string: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the printed form of value piece by piece, without recursion.
+
+    Collections nested deeper than max_depth are printed as #, elements
+    after the first max_length of a collection as ... and strings longer
+    than max_string are cut short with ..., as are the hex digits of bytes."""
+    # Hash-maps are limited to max_length entries
+    max_children = None if max_length is None else max_length * 2
+    # Each frame is [children iterator, closing bracket, first child flag,
+    # children left before the length limit]
+    stack: List[list] = []
+    pending: Optional[MalExpression] = value
+    while True:
+        if pending is not None:
+            brackets = _brackets(pending)
+            if brackets is None:
+                if (
+                    max_string is not None
+                    and isinstance(pending, MalString)
+                    and len(pending.native()) > max_string
+                ):
+                    pending = MalString(pending.native()[:max_string] + "...")
+                if (
+                    max_string is not None
+                    and isinstance(pending, MalBytes)
+                    and len(pending.native()) * 2 > max_string
+                ):
+                    # The hex digits are cut short like a string
+                    data = pending.native()[: (max_string + 1) // 2]
+                    yield '(hex->bytes "' + data.hex()[:max_string] + '...")'
+                else:
+                    yield pending.readable_str() if readably else pending.unreadable_str()
+            elif max_depth is not None and len(stack) >= max_depth:
+                yield "#"
+            else:
+                yield brackets[0]
+                limit = max_children
+                if limit is not None and not isinstance(pending, MalHash_map):
+                    limit = max_length
+                stack.append([iter(_children(pending)), brackets[1], True, limit])
+            pending = None
+        if not stack:
+            return
+        frame = stack[-1]
+        pending = next(frame[0], None)
+        if pending is not None and frame[3] is not None:
+            if frame[3] == 0:
+                yield "..." if frame[2] else " ..."
+                pending = None
+            frame[3] -= 1
+        if pending is None:
+            yield frame[1]
+            stack.pop()
+        elif frame[2]:
+            frame[2] = False
+        else:
+            yield " "
+
+
+class PrintLimits(NamedTuple):
+    """Limits on printed values, see pr_str. None is unlimited."""
+
+    max_chars: Optional[int] = None
+    max_depth: Optional[int] = None
+    max_length: Optional[int] = None
+
+
+def pr_str(
+    value: MalExpression,
+    readably: bool = True,
+    max_depth: Optional[int] = None,
+    max_length: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """Return the printed form of value.
+
+    Output is cut off with ... once it reaches max_chars characters,
+    without printing the rest of value."""
+    if max_chars is None:
+        return "".join(tokens(value, readably, max_depth, max_length))
+    parts: List[str] = []
+    available = max_chars
+    for token in tokens(value, readably, max_depth, max_length, max_chars):
+        if len(token) > available:
+            parts.append(token[:available])
+            parts.append("...")
+            break
+        parts.append(token)
+        available -= len(token)
+    return "".join(parts)
+
+
+def pr_limited(
+    value: MalExpression, limits: Optional[PrintLimits], readably: bool = True
+) -> str:
+    if limits is None:
+        return pr_str(value, readably)
+    return pr_str(
+        value, readably, limits.max_depth, limits.max_length, limits.max_chars
+    )
+
+
+def write(
+    value: MalExpression,
+    stream: TextIO,
+    readably: bool = True,
+    max_depth: Optional[int] = None,
+) -> None:
+    for token in tokens(value, readably, max_depth):
+        stream.write(token)
+
+
+class LineWriter:
+    """Text stream adapter that hands each completed line to a callback."""
+
+    def __init__(self, emit: Callable[[str], None]):
+        self._emit = emit
+        self._partial: List[str] = []
+
+    def write(self, s: str) -> int:
+        lines = s.split("\n")
+        for line in lines[:-1]:
+            self._partial.append(line)
+            self._emit("".join(self._partial))
+            self._partial = []
+        if lines[-1]:
+            self._partial.append(lines[-1])
+        return len(s)
+
+    def flush(self) -> None:
+        if self._partial:
+            self._emit("".join(self._partial))
+            self._partial = []
+
+
+class _ColumnWriter:
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.column = 0
+
+    def write(self, s: str) -> None:
+        self.stream.write(s)
+        newline = s.rfind("\n")
+        if newline < 0:
+            self.column += len(s)
+        else:
+            self.column = len(s) - newline - 1
+
+
+def _fits(
+    value: MalExpression, available: int, readably: bool, max_depth: Optional[int]
+) -> bool:
+    # Stops as soon as the budget is exceeded, so the cost is bounded by width
+    for token in tokens(value, readably, max_depth):
+        available -= len(token)
+        if available < 0:
+            return False
+    return True
+
+
+def pprint(
+    value: MalExpression,
+    stream: TextIO,
+    width: int = DEFAULT_WIDTH,
+    max_depth: Optional[int] = None,
+    readably: bool = True,
+) -> None:
+    """Pretty print value into stream, breaking collections that exceed width.
+
+    Collections that fit in the remaining width are written on one line,
+    otherwise each element starts a new line aligned after the open bracket,
+    with hash-map keys and values kept together."""
+    out = _ColumnWriter(stream)
+    work: List[Union[str, Tuple[MalExpression, int]]] = [(value, 0)]
+    while work:
+        item = work.pop()
+        if isinstance(item, str):
+            out.write(item)
+            continue
+        expr, level = item
+        remaining = None if max_depth is None else max_depth - level
+        brackets = _brackets(expr)
+        if (
+            brackets is None
+            or remaining == 0
+            or _fits(expr, width - out.column, readably, remaining)
+        ):
+            for token in tokens(expr, readably, remaining):
+                out.write(token)
+            continue
+        out.write(brackets[0])
+        newline = "\n" + " " * out.column
+        children = list(_children(expr))
+        is_map = isinstance(expr, MalHash_map)
+        work.append(brackets[1])
+        for i in range(len(children) - 1, -1, -1):
+            work.append((children[i], level + 1))
+            if i > 0:
+                work.append(" " if is_map and i % 2 else newline)
+    out.write("\n")
+
+
+def pformat(
+    value: MalExpression,
+    width: int = DEFAULT_WIDTH,
+    max_depth: Optional[int] = None,
+    readably: bool = True,
+) -> str:
+    stream = io.StringIO()
+    pprint(value, stream, width, max_depth, readably)
+    return stream.getvalue()
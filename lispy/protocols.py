@@ -0,0 +1,312 @@
+from __future__ import annotations
+from typing import Dict, Hashable, List, Optional, Sequence, TYPE_CHECKING
+
+from .core import require_args
+from .macros import macro
+from .mal_types import (
+    MalExpression,
+    MalAtom,
+    MalBoolean,
+    MalBytes,
+    MalFloat,
+    MalFunction,
+    MalFunctionCompiled,
+    MalHash_map,
+    MalInt,
+    MalKeyword,
+    MalList,
+    MalMeta,
+    MalNil,
+    MalPattern,
+    MalPythonObject,
+    MalString,
+    MalSymbol,
+    MalVector,
+    MalInvalidArgumentException,
+    MalSyntaxException,
+    hash_key,
+)
+
+if TYPE_CHECKING:
+    from .mal_types import HashMapDict
+
+DEFAULT = "default"
+
+# Type names match find-type in the Mal protocols library
+TYPE_NAMES = {
+    MalSymbol: "mal/symbol",
+    MalKeyword: "mal/keyword",
+    MalAtom: "mal/atom",
+    MalNil: "mal/nil",
+    MalBoolean: "mal/boolean",
+    MalInt: "mal/number",
+    MalFloat: "mal/number",
+    MalString: "mal/string",
+    MalBytes: "mal/bytes",
+    MalPattern: "mal/pattern",
+    MalList: "mal/list",
+    MalVector: "mal/vector",
+    MalHash_map: "mal/map",
+    MalFunction: "mal/function",
+}
+
+
+def _dispatch_type(value: MalExpression) -> type:
+    # Injected objects dispatch on the type they wrap
+    if type(value) is MalPythonObject:
+        return type(value.native())
+    return type(value)
+
+
+def _type_names(cls: type) -> List[str]:
+    """Type names to try for a dispatch type, most specific first."""
+    for mal_type in cls.__mro__:
+        if mal_type in TYPE_NAMES:
+            return [TYPE_NAMES[mal_type]]
+    return [f"python/{c.__name__}" for c in cls.__mro__]
+
+
+def _meta_type(value: MalExpression) -> Optional[str]:
+    # Checked on every dispatch, so avoid the meta property allocating MalNil
+    if isinstance(value, MalMeta) and isinstance(value._meta, MalHash_map):
+        t = value._meta.native().get(MalKeyword("type"))
+        if isinstance(t, MalKeyword):
+            return t.native()
+    return None
+
+
+def type_of(value: MalExpression) -> MalExpression:
+    meta_type = _meta_type(value)
+    if meta_type is not None:
+        return MalKeyword(meta_type)
+    return MalKeyword(_type_names(_dispatch_type(value))[0])
+
+
+class MalProtocol(MalExpression):
+    def __init__(self, name: str, methods: Sequence[str]) -> None:
+        self._name = name
+        self._methods = tuple(methods)
+        # type name -> method name -> implementation
+        self._impls: Dict[str, Dict[str, MalFunction]] = {}
+        # method name -> dispatch type -> implementation, cleared on extend
+        self._caches: Dict[str, Dict[type, Optional[MalFunction]]] = {
+            m: {} for m in self._methods
+        }
+
+    def readable_str(self) -> str:
+        return f"#<protocol {self._name}>"
+
+    def native(self) -> Dict[str, Dict[str, MalFunction]]:
+        return self._impls
+
+    @property
+    def methods(self) -> Sequence[str]:
+        return self._methods
+
+    def extend(self, type_name: str, impls: Dict[str, MalFunction]) -> None:
+        for method in impls:
+            if method not in self._caches:
+                raise MalInvalidArgumentException(
+                    MalKeyword(method), f"not a method of protocol {self._name}"
+                )
+        self._impls.setdefault(type_name, {}).update(impls)
+        for cache in self._caches.values():
+            cache.clear()
+
+    def _resolve(self, method: str, names: List[str]) -> Optional[MalFunction]:
+        for name in names + [DEFAULT]:
+            impl = self._impls.get(name, {}).get(method)
+            if impl is not None:
+                return impl
+        return None
+
+    def find(self, method: str, value: MalExpression) -> Optional[MalFunction]:
+        meta_type = _meta_type(value)
+        if meta_type is not None:
+            return self._resolve(method, [meta_type])
+        cache = self._caches[method]
+        cls = _dispatch_type(value)
+        try:
+            return cache[cls]
+        except KeyError:
+            impl = cache[cls] = self._resolve(method, _type_names(cls))
+            return impl
+
+    def satisfies(self, value: MalExpression) -> bool:
+        return all(self.find(m, value) is not None for m in self._methods)
+
+    def method(self, method: str) -> MalFunction:
+        def dispatch(args: List[MalExpression]) -> MalExpression:
+            if not args:
+                raise MalSyntaxException(f"{method} requires at least one argument")
+            impl = self.find(method, args[0])
+            if impl is None:
+                raise MalInvalidArgumentException(
+                    args[0], f"no implementation of {self._name}/{method}"
+                )
+            return impl.call(args)
+
+        return MalFunctionCompiled(dispatch)
+
+
+class MalMultiFunction(MalFunctionCompiled):
+    def __init__(
+        self,
+        name: str,
+        dispatch: MalFunction,
+        methods: Optional[Dict[Hashable, MalFunction]] = None,
+    ) -> None:
+        super().__init__(self._call_multi)
+        self._name = name
+        self._dispatch = dispatch
+        # Shared with copies, keyed on the structural hash of dispatch values
+        self._methods: Dict[Hashable, MalFunction] = {} if methods is None else methods
+
+    def copy(self) -> MalMultiFunction:
+        f = self.__class__(self._name, self._dispatch, self._methods)
+        if self.is_macro():
+            f.make_macro()
+        return f
+
+    def add_method(self, value: MalExpression, method: MalFunction) -> None:
+        self._methods[hash_key(value)] = method
+
+    def _call_multi(self, args: List[MalExpression]) -> MalExpression:
+        value = self._dispatch.call(args)
+        method = self._methods.get(hash_key(value))
+        if method is None:
+            method = self._methods.get(_DEFAULT_KEY)
+            if method is None:
+                raise MalInvalidArgumentException(
+                    value, f"no method in multimethod {self._name}"
+                )
+        return method.call(args)
+
+
+_DEFAULT_KEY = hash_key(MalKeyword(DEFAULT))
+
+
+def _protocol(proto: MalExpression) -> MalProtocol:
+    if not isinstance(proto, MalProtocol):
+        raise MalInvalidArgumentException(proto, "not a protocol")
+    return proto
+
+
+def _type_name(type_: MalExpression) -> str:
+    if not isinstance(type_, (MalKeyword, MalString)):
+        raise MalInvalidArgumentException(type_, "not a type keyword")
+    return type_.native()
+
+
+def _seq(form: MalExpression) -> List[MalExpression]:
+    if not isinstance(form, (MalList, MalVector)):
+        raise MalInvalidArgumentException(form, "not a list or vector")
+    return form.native()
+
+
+def defprotocol(args: List[MalExpression]) -> MalExpression:
+    if not args or not isinstance(args[0], MalSymbol):
+        raise MalSyntaxException("defprotocol requires a name")
+    names: List[MalSymbol] = []
+    for signature in args[1:]:
+        method = _seq(signature)[0] if _seq(signature) else MalNil()
+        if not isinstance(method, MalSymbol):
+            raise MalInvalidArgumentException(method, "not a symbol")
+        names.append(method)
+    proto = MalProtocol(args[0].native(), [n.native() for n in names])
+    defs: List[MalExpression] = [
+        MalList([MalSymbol("def!"), n, proto.method(n.native())]) for n in names
+    ]
+    return MalList(
+        [MalSymbol("do")] + defs + [MalList([MalSymbol("def!"), args[0], proto])]
+    )
+
+
+def extend(args: List[MalExpression]) -> MalExpression:
+    if len(args) < 3 or len(args) % 2 != 1:
+        raise MalSyntaxException("extend requires a type and protocol/methods pairs")
+    type_name = _type_name(args[0])
+    for i in range(1, len(args), 2):
+        impls = args[i + 1]
+        if not isinstance(impls, MalHash_map):
+            raise MalInvalidArgumentException(impls, "not a hash map")
+        methods: Dict[str, MalFunction] = {}
+        for k, v in impls.native().items():
+            if not isinstance(v, MalFunction):
+                raise MalInvalidArgumentException(v, "not a function")
+            methods[k.native()] = v
+        _protocol(args[i]).extend(type_name, methods)
+    return MalNil()
+
+
+def extend_type(args: List[MalExpression]) -> MalExpression:
+    if len(args) < 2:
+        raise MalSyntaxException("extend-type requires a type and protocols")
+    protocols: List[MalExpression] = []
+    impls: List[HashMapDict] = []
+    for x in args[1:]:
+        if isinstance(x, MalSymbol):
+            protocols.append(x)
+            impls.append({})
+        elif not impls:
+            raise MalSyntaxException("extend-type methods must follow a protocol")
+        else:
+            method = _seq(x)
+            if len(method) < 2 or not isinstance(method[0], MalSymbol):
+                raise MalInvalidArgumentException(x, "not a method definition")
+            fn = MalList([MalSymbol("fn*")] + method[1:])
+            impls[-1][MalKeyword(method[0].native())] = fn
+    form: List[MalExpression] = [MalSymbol("extend"), args[0]]
+    for proto, methods in zip(protocols, impls):
+        form += [proto, MalHash_map(methods)]
+    return MalList(form)
+
+
+def satisfies_q(proto: MalExpression, value: MalExpression) -> MalExpression:
+    return MalBoolean(_protocol(proto).satisfies(value))
+
+
+def make_multi(name: MalExpression, dispatch: MalExpression) -> MalExpression:
+    if not isinstance(dispatch, MalFunction):
+        raise MalInvalidArgumentException(dispatch, "not a function")
+    return MalMultiFunction(name.unreadable_str(), dispatch)
+
+
+def add_method(
+    multi: MalExpression, value: MalExpression, method: MalExpression
+) -> MalExpression:
+    if not isinstance(multi, MalMultiFunction):
+        raise MalInvalidArgumentException(multi, "not a multimethod")
+    if not isinstance(method, MalFunction):
+        raise MalInvalidArgumentException(method, "not a function")
+    multi.add_method(value, method)
+    return multi
+
+
+def defmulti(args: List[MalExpression]) -> MalExpression:
+    if len(args) != 2 or not isinstance(args[0], MalSymbol):
+        raise MalSyntaxException("defmulti requires a name and dispatch function")
+    make = MalList([MalSymbol("make-multi"), MalString(args[0].native()), args[1]])
+    return MalList([MalSymbol("def!"), args[0], make])
+
+
+def defmethod(args: List[MalExpression]) -> MalExpression:
+    if len(args) < 3:
+        raise MalSyntaxException(
+            "defmethod requires a name, dispatch value, parameters and body"
+        )
+    fn = MalList([MalSymbol("fn*")] + args[2:])
+    return MalList([MalSymbol("add-method!"), args[0], args[1], fn])
+
+
+ns = {
+    "defprotocol": macro(defprotocol),
+    "extend-type": macro(extend_type),
+    "extend": MalFunctionCompiled(extend),
+    "satisfies?": MalFunctionCompiled(lambda args: satisfies_q(*require_args(args, 2))),
+    "type-of": MalFunctionCompiled(lambda args: type_of(require_args(args, 1)[0])),
+    "defmulti": macro(defmulti),
+    "defmethod": macro(defmethod),
+    "make-multi": MalFunctionCompiled(lambda args: make_multi(*require_args(args, 2))),
+    "add-method!": MalFunctionCompiled(lambda args: add_method(*require_args(args, 3))),
+}
@@ -1,5 +1,14 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Optional, Union, Iterator, cast
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Union,
+    Iterator,
+    cast,
+)
 import re
 import itertools
 
@@ -13,6 +22,8 @@ from .mal_types import (
     MalBlank,
     MalVector,
     MalHash_map,
+    MalMeta,
+    SourceMap,
 )
 from .mal_types import MalSymbol, MalString, MalKeyword, MalSyntaxException
 
@@ -184,7 +195,250 @@ class Reader:
         )
 
 
-def read(x: Union[str, Iterator[str]]) -> MalExpression:
+class _Frame:
+    __slots__ = ("end", "macro", "items", "offset")
+
+    def __init__(self, end: Optional[str], macro: str = "", offset: int = 0):
+        # end is the closing bracket, or None for the reader macro
+        # expanding to a call to the macro symbol
+        self.end = end
+        self.macro = macro
+        self.items: List[MalExpression] = []
+        self.offset = offset
+
+
+def _build_hash_map(items: List[MalExpression]) -> MalHash_map:
+    if len(items) % 2 != 0:
+        raise MalSyntaxException("invalid hash-map entries")
+    hashmap: HashMapDict = {}
+    for i in range(0, len(items), 2):
+        if not isinstance(items[i], (MalString, MalKeyword)):
+            raise MalSyntaxException("hash-map key not string or keyword")
+        hashmap[cast(Union[MalString, MalKeyword], items[i])] = items[i + 1]
+    return MalHash_map(hashmap)
+
+
+class Scanner:
+    """Single pass reader, building expressions directly from the source text.
+
+    Dispatches on the first character of each token and uses an explicit
+    stack of open forms, so nesting depth is not limited by recursion.
+    Other than strings, tokens never span lines when reading from
+    an iterator of lines, matching Tokenizer.
+
+    When given a source name, lists, vectors and hash-maps record their
+    SourcePosition. Each item of an iterator is counted as one line."""
+
+    SKIP_RE = re.compile(r"(?:[\s,]+|;.*)*")
+    ATOM_RE = re.compile(r"""[^\s\[\]{}()'"`@,;]+""")
+    STRING_RE = re.compile(r'"((?:[\\].|[^\\"])*)(")?')
+    # The rest of a string continued on the next line
+    STRING_REST_RE = re.compile(r'((?:[\\].|[^\\"])*)(")?')
+    OPEN = {"(": ")", "[": "]", "{": "}"}
+    CLOSE = ")]}"
+    CONSTANTS: Dict[str, Callable[[], MalExpression]] = {
+        "nil": MalNil,
+        "true": lambda: MalBoolean(True),
+        "false": lambda: MalBoolean(False),
+    }
+    MACROS = {
+        "'": "quote",
+        "`": "quasiquote",
+        "~": "unquote",
+        "~@": "splice-unquote",
+        "@": "deref",
+        "^": "with-meta",
+    }
+
+    def __init__(self, lines: Union[str, Iterator[str]], source: Optional[str] = None):
+        if isinstance(lines, str):
+            self._text = lines
+            self._lines: Optional[Iterator[str]] = None
+        else:
+            self._text = ""
+            self._lines = iter(lines)
+        self._pos = 0
+        self._source_map: Optional[SourceMap] = None
+        if source is not None:
+            text = lines if isinstance(lines, str) else None
+            self._source_map = SourceMap(source, text)
+        # Offset in the whole source of the start of _text
+        self._base = 0
+
+    @property
+    def source_map(self) -> Optional[SourceMap]:
+        return self._source_map
+
+    def _skip(self) -> bool:
+        """Skip whitespace and comments, returns False at end of input."""
+        while True:
+            self._pos = self.SKIP_RE.match(self._text, self._pos).end()
+            if self._pos < len(self._text):
+                return True
+            if self._lines is None:
+                return False
+            line = next(self._lines, None)
+            if line is None:
+                self._lines = None
+                return False
+            self._base += len(self._text)
+            if self._source_map is not None:
+                self._source_map.add_line(self._base)
+            self._text = line
+            self._pos = 0
+
+    def _extend(self) -> bool:
+        """Append the next line to the unread text, returns False at end of input."""
+        if self._lines is None:
+            return False
+        line = next(self._lines, None)
+        if line is None:
+            self._lines = None
+            return False
+        if self._source_map is not None:
+            self._source_map.add_line(self._base + len(self._text))
+        pos = self._pos
+        self._base += pos
+        self._text = self._text[pos:] + line
+        self._pos = 0
+        return True
+
+    def iter_forms(self) -> Iterator[MalExpression]:
+        """Yield each top level form, reading no further than the end of it."""
+        while True:
+            form = self.read_form()
+            if isinstance(form, MalBlank):
+                return
+            yield form
+
+    def read_form(self) -> MalExpression:
+        """Read the next form, returning MalBlank if there is none."""
+        stack: List[_Frame] = []
+        while True:
+            if not self._skip():
+                if not stack:
+                    return MalBlank()
+                end = stack[-1].end
+                if end is None:
+                    raise MalSyntaxException("incomplete form")
+                raise MalSyntaxException("expected '" + end + "', got EOF")
+            text = self._text
+            pos = self._pos
+            ch = text[pos]
+            value: MalExpression
+            if ch in self.OPEN:
+                stack.append(_Frame(self.OPEN[ch], offset=self._base + pos))
+                self._pos = pos + 1
+                continue
+            elif ch in self.CLOSE:
+                if not stack or stack[-1].end != ch:
+                    raise MalSyntaxException("unexpected '" + ch + "'")
+                self._pos = pos + 1
+                frame = stack.pop()
+                if ch == ")":
+                    value = MalList(frame.items)
+                elif ch == "]":
+                    value = MalVector(frame.items)
+                else:
+                    value = _build_hash_map(frame.items)
+                if self._source_map is not None:
+                    form = cast(MalMeta, value)
+                    form._source_map = self._source_map
+                    form._source_offset = frame.offset
+            elif ch == '"':
+                match = self.STRING_RE.match(text, pos)
+                self._pos = match.end()
+                parts = [match.group(1)]
+                # Strings may span lines, only the unmatched tail is carried over
+                while match.group(2) is None and self._extend():
+                    match = self.STRING_REST_RE.match(self._text)
+                    self._pos = match.end()
+                    parts.append(match.group(1))
+                if match.group(2) is None:
+                    raise MalSyntaxException("expected '\"', got EOF")
+                body = "".join(parts)
+                value = MalString(self._unescape(body) if "\\" in body else body)
+            elif ch in "'`~@^":
+                if ch == "~" and text.startswith("~@", pos):
+                    ch = "~@"
+                self._pos = pos + len(ch)
+                stack.append(_Frame(None, self.MACROS[ch]))
+                continue
+            else:
+                match = self.ATOM_RE.match(text, pos)
+                self._pos = match.end()
+                value = self._atom(match.group())
+
+            # Add the completed form to its parent, completing reader macros
+            while stack:
+                frame = stack[-1]
+                frame.items.append(value)
+                if frame.end is not None:
+                    break
+                items = frame.items
+                if frame.macro != "with-meta":
+                    value = MalList([MalSymbol(frame.macro), value])
+                elif len(items) == 2:
+                    # ^ reads the metadata before the form
+                    value = MalList([MalSymbol(frame.macro), items[1], items[0]])
+                else:
+                    break
+                stack.pop()
+            else:
+                return value
+
+    def _atom(self, token: str) -> MalExpression:
+        digits = token[1:] if token[0] == "-" else token
+        if digits.isdigit() and digits.isascii():
+            return MalInt(int(token))
+        whole, dot, fraction = digits.partition(".")
+        if (
+            dot
+            and fraction.isdigit()
+            and fraction.isascii()
+            and (not whole or (whole.isdigit() and whole.isascii()))
+        ):
+            return MalFloat(float(token))
+        if token[0] == ":":
+            return MalKeyword(token[1:])
+        constant = self.CONSTANTS.get(token)
+        if constant is not None:
+            return constant()
+        return MalSymbol(token)
+
+    def _unescape(self, x: str) -> str:
+        chars = []
+        i = 0
+        while i < len(x):
+            c = x[i]
+            if c == "\\" and i + 1 < len(x):
+                n = x[i + 1]
+                if n == "n":
+                    c = "\n"
+                elif n in '\\"':
+                    c = n
+                else:
+                    c += n
+                i += 1
+            chars.append(c)
+            i += 1
+        return "".join(chars)
+
+
+def read(x: Union[str, Iterator[str]], source: Optional[str] = None) -> MalExpression:
+    return Scanner(x, source).read_form()
+
+
+def iter_forms(
+    x: Union[str, Iterator[str]], source: Optional[str] = None
+) -> Iterator[MalExpression]:
+    return Scanner(x, source).iter_forms()
+
+
+def reference_read(x: Union[str, Iterator[str]]) -> MalExpression:
+    """Read using the regex Tokenizer and recursive Reader.
+
+    Kept as a reference implementation for testing Scanner."""
     tokens = Tokenizer(x)
     if tokens.peek() is None:
         return MalBlank()
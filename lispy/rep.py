@@ -7,6 +7,12 @@ from typing import Optional, List, Union, Iterator, TYPE_CHECKING
 
 from . import core
 from . import reader
+from . import printer
+from . import parallel
+from . import macros
+from . import protocols
+from . import jsonio
+from . import modules
 from .env import Env
 from .mal_types import (
     MalExpression,
@@ -25,7 +31,9 @@ from .mal_types import (
     MalInvalidArgumentException,
     MalSyntaxException,
     MalString,
+    MalExecutionLimitError,
 )
+from .output import OutputSink
 
 if TYPE_CHECKING:
     from .mal_types import HashMapDict
@@ -34,6 +42,11 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# Core functions not available to restricted environments
+FILE_FUNCTIONS = frozenset(
+    ("slurp", "spit", "open", "line-seq", "with-open*", "readline")
+)
+
 
 def READ(x: Union[str, Iterator[str]]) -> MalExpression:
     return reader.read(x)
@@ -98,7 +111,7 @@ def EVAL(ast: MalExpression, env: Env) -> MalExpression:
 
 def _EVAL(ast: MalExpression, env: Env) -> MalExpression:
     while True:
-        log.debug("EVAL: %s", str(ast))
+        log.debug("EVAL: %s", ast)
         env.check_execution_limit()
         ast = macroexpand(ast, env)
         ast_native = ast.native()
@@ -217,24 +230,32 @@ def _EVAL(ast: MalExpression, env: Env) -> MalExpression:
 
                 env = Env(outer=f.env(), binds=f.params().native(), exprs=args,)
                 continue
-            elif isinstance(f, (MalFunctionCompiled, MalFunctionPython)):
+            elif isinstance(f, MalFunctionCompiled):
+                # args is handed over, so no other reference to the evaluated
+                # arguments is kept during the call
+                del evaled_ast
+                return f.call_owned(args)
+            elif isinstance(f, MalFunctionPython):
                 return f.call(args)
             else:
                 raise MalInvalidArgumentException(f, "not a function")
 
 
-def PRINT(x: MalExpression) -> str:
-    return str(x)
+def PRINT(x: MalExpression, limits: Optional[printer.PrintLimits] = None) -> str:
+    return printer.pr_limited(x, limits)
 
 
 def rep(x: Union[str, Iterator[str]], env: Env) -> str:
-    return PRINT(EVAL(READ(x), env))
+    return PRINT(EVAL(READ(x), env), env.print_limits)
 
 
 def init_repl_env(
     argv: Optional[List[str]] = None,
     restricted: bool = False,
     execution_limit: Optional[ExecutionLimit] = None,
+    worker_pool: Optional[parallel.WorkerPool] = None,
+    output: Optional[OutputSink] = None,
+    print_limits: Optional[printer.PrintLimits] = None,
 ) -> Env:
     def eval_func(args: List[MalExpression], env: Env) -> MalExpression:
         a0 = args[0]
@@ -243,29 +264,41 @@ def init_repl_env(
         return EVAL(a0, env)
 
     env = Env(None, execution_limit=execution_limit)
+    env.print_limits = print_limits
     for key in core.ns:
-        if not restricted or key not in {"slurp", "readline"}:
+        if not restricted or key not in FILE_FUNCTIONS:
             env.set(key, core.ns[key])
 
+    sink = OutputSink() if output is None else output
+    env.output = sink
+    emit = sink.write_line
+    env.set("prn", MalFunctionCompiled(lambda args: core.prn(args, emit)))
+    env.set("println", MalFunctionCompiled(lambda args: core.println(args, emit)))
+    env.set("pprint", MalFunctionCompiled(lambda args: core.pprint(args, emit)))
+    for key in macros.ns:
+        env.set(key, macros.ns[key])
+    for key in protocols.ns:
+        env.set(key, protocols.ns[key])
+    for key in jsonio.ns:
+        env.set(key, jsonio.ns[key])
+
     env.set("eval", MalFunctionCompiled(lambda args: eval_func(args, env)))
+
+    pool = parallel.WorkerPool() if worker_pool is None else worker_pool
+    env.set("pmap", MalFunctionCompiled(lambda args: parallel.pmap(pool, args)))
+    env.set("pcalls", MalFunctionCompiled(lambda args: parallel.pcalls(pool, args)))
     rep('(def! *host-language* "python.lispy")', env)
 
     if not restricted:
-        rep(
-            '(def! load-file (fn* (f) (eval (read-string (str "(do " (slurp f) "\nnil)")))))',
-            env,
-        )
+        loader = modules.ModuleLoader(env, EVAL)
+        env.set("load-file", MalFunctionCompiled(loader.load_file))
+        env.set("require", MalFunctionCompiled(loader.require))
 
     if restricted and argv is None:
         argv = []
     mal_argv = MalList([MalString(x) for x in (sys.argv[2:] if argv is None else argv)])
     env.set("*ARGV*", mal_argv)
 
-    rep(
-        "(defmacro! cond (fn* (& xs) (if (> (count xs) 0) (list 'if (first xs) (if (> (count xs) 1) (nth xs 1) (throw \"odd number of forms to cond\")) (cons 'cond (rest (rest xs)))))))",
-        env,
-    )
-
     return env
 
 
@@ -310,17 +343,18 @@ def rep_handling_exceptions(
     try:
         return rep(lines, repl_env)
     except MalUnknownSymbolException as e:
-        m = "'" + e.func + "' not found"
-        if verbose:
-            m += "\n" + e.readable_backtrace()
-            m += "\n" + traceback.format_exc()
-        return m
+        return _error_message("'" + e.func + "' not found", e, repl_env, verbose)
     except MalException as e:
-        m = "ERROR: " + str(e)
-        if verbose:
-            m += "\n" + e.readable_backtrace()
-            m += "\n" + traceback.format_exc()
-        return m
+        m = "ERROR: " + PRINT(e.native(), repl_env.print_limits)
+        return _error_message(m, e, repl_env, verbose)
+
+
+def _error_message(m: str, e: MalException, env: Env, verbose: bool) -> str:
+    if verbose:
+        # Thrown values and forms may be large, so they are printed with the limits
+        m += "\n" + e.readable_backtrace(lambda f: PRINT(f, env.print_limits))
+        m += "\n" + traceback.format_exc()
+    return m
 
 
 def repl(env: Env, verbose: bool = False):
@@ -336,12 +370,20 @@ def repl(env: Env, verbose: bool = False):
             yield line
             line = input("> ")
 
+    sink = env.output if env.output is not None else OutputSink()
     while not eof:
         try:
             env.reset_execution_limit()
-            core.python_print(rep_handling_exceptions(line_reader(), env, verbose))
+            sink.reset_quota()
+            sink.write_line(rep_handling_exceptions(line_reader(), env, verbose))
         except EOFError:
             eof = True
+        except MalExecutionLimitError as e:
+            # The result itself did not fit in the output quota
+            sink.flush()
+            core.python_print("ERROR: " + PRINT(e.native(), env.print_limits))
+        finally:
+            sink.flush()
 
 
 def load_file(env: Env, filename: Union[str, Path], verbose: bool = False) -> str:
@@ -0,0 +1,116 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from lispy import Lispy, rep
+from lispy.mal_types import (
+    MalBytes,
+    MalIndexError,
+    MalInvalidArgumentException,
+)
+
+
+class TestBytes(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_constructors(self):
+        self.assertEqual('(hex->bytes "0102ff")', self.rep("(bytes [1 2 255])"))
+        self.assertEqual("true", self.rep('(= (bytes [104 105]) (hex->bytes "6869"))'))
+        self.assertEqual("true", self.rep("(bytes? (bytes '()))"))
+        self.assertEqual("false", self.rep('(bytes? "")'))
+        self.assertEqual(":mal/bytes", self.rep("(type-of (bytes [1 2]))"))
+        self.assertEqual(hash(MalBytes(b"ab")), hash(MalBytes(bytearray(b"ab"))))
+        self.assertEqual(1, len({MalBytes(b"ab"), MalBytes(memoryview(b"xab")[1:])}))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(bytes [256])")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(bytes ["a"])')
+
+    def test_printed_form_reads_back(self):
+        printed = self.rep("(pr-str (bytes [0 9]))")
+        read_back = self.rep(f"(= (bytes [0 9]) (eval (read-string {printed})))")
+        self.assertEqual("true", read_back)
+
+    def test_sequence_functions(self):
+        self.rep('(def! b (string->bytes "header:body"))')
+        self.assertEqual("11", self.rep("(count b)"))
+        self.assertEqual("104", self.rep("(nth b 0)"))
+        self.assertEqual('"body"', self.rep("(bytes->string (subs b 7))"))
+        self.assertEqual('"head"', self.rep("(bytes->string (subs b 0 4))"))
+        self.assertEqual(
+            '(hex->bytes "010203")', self.rep("(concat (bytes [1]) (bytes [2 3]))")
+        )
+        with self.assertRaises(MalIndexError):
+            self.rep("(nth b 11)")
+        with self.assertRaises(MalIndexError):
+            self.rep("(subs b 5 12)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(concat b [1])")
+        self.assertEqual("104", self.rep("(first b)"))
+        self.assertEqual('"eader:body"', self.rep("(bytes->string (rest b))"))
+        self.assertEqual("(1 2)", self.rep("(seq (bytes [1 2]))"))
+        self.assertEqual("nil", self.rep("(seq (bytes []))"))
+        self.assertEqual("nil", self.rep("(first (bytes []))"))
+        self.assertEqual("true", self.rep("(empty? (rest (bytes [1])))"))
+
+    def test_slices_share_buffer(self):
+        data = b"abcdef"
+        lispy = Lispy(injections={"data": data})
+        tail = lispy.eval("(subs ($ data) 3)")
+        self.assertIsInstance(tail, MalBytes)
+        self.assertIs(data, tail.native().obj)
+        self.assertEqual(b"def", bytes(tail.native()))
+
+    def test_writable_buffers_copied(self):
+        data = bytearray(b"abcdef")
+        value = MalBytes(data)
+        data[0] = ord("A")
+        self.assertEqual(b"abcdef", bytes(value.native()))
+        self.assertEqual(b"ace", bytes(MalBytes(memoryview(b"abcdef")[::2]).native()))
+
+    def test_hex_and_base64(self):
+        self.assertEqual('"00ff"', self.rep("(bytes->hex (bytes [0 255]))"))
+        self.assertEqual('"aGk="', self.rep('(bytes->base64 (string->bytes "hi"))'))
+        self.assertEqual('"hi"', self.rep('(bytes->string (base64->bytes "aGk="))'))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(hex->bytes "0g")')
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(base64->bytes "a*")')
+
+    def test_charsets(self):
+        self.assertEqual('"c3a9"', self.rep('(bytes->hex (string->bytes "é"))'))
+        latin = self.rep('(bytes->hex (string->bytes "é" "latin-1"))')
+        self.assertEqual('"e9"', latin)
+        decoded = self.rep('(bytes->string (hex->bytes "e9") "latin-1")')
+        self.assertEqual('"é"', decoded)
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(string->bytes "é" "ascii")')
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(bytes->string (hex->bytes "ff"))')
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(string->bytes "a" "no-such-charset")')
+
+    def test_codec(self):
+        self.assertEqual("true", self.rep("(bytes? (encode [1 2]))"))
+        self.assertEqual("[1 2]", self.rep("(decode (encode [1 2]))"))
+
+    def test_slurp_binary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "data.bin"
+            path.write_bytes(b"\x00\x01\xff")
+            for mmap in ("true", "false"):
+                self.assertEqual(
+                    '(hex->bytes "0001ff")',
+                    self.rep(f'(slurp "{path}" :binary true :mmap {mmap})'),
+                )
+            empty = Path(tmpdir) / "empty.bin"
+            empty.write_bytes(b"")
+            self.assertEqual("0", self.rep(f'(count (slurp "{empty}" :binary true))'))
+
+
+if __name__ == "__main__":
+    unittest.main()
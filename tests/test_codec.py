@@ -0,0 +1,85 @@
+import unittest
+
+from lispy import Lispy, codec, rep
+from lispy.mal_types import (
+    MalList,
+    MalInt,
+    MalInvalidArgumentException,
+    MalSyntaxException,
+)
+
+
+class TestCodec(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def read(self, input: str):
+        return rep.READ(input)
+
+    def rep_value(self, input: str):
+        return rep.EVAL(self.read(input), self._repl_env)
+
+    def test_round_trip(self):
+        value = self.read(
+            '(1 -1 0 300 -70000 123456789012345678901234567890 1.5 -0.0 "héllo"'
+            ' :k sym nil true false [] {} () {"a" [1 {:b ()}]})'
+        )
+        decoded = codec.decode(codec.encode(value))
+        self.assertIsInstance(decoded, MalList)
+        self.assertEqual(value.readable_str(), decoded.readable_str())
+        value = self.rep_value("[(bytes [0 255]) (bytes [])]")
+        self.assertEqual(value, codec.decode(codec.encode(value)))
+        with self.assertRaises(MalSyntaxException):
+            codec.decode(codec.encode(value)[:-2])
+
+    def test_back_references(self):
+        once = codec.encode(self.read('["a long string"]'))
+        twice = codec.encode(self.read('["a long string" "a long string"]'))
+        self.assertEqual(2, len(twice) - len(once))
+        # Strings, keywords and symbols with the same text stay distinct
+        value = self.read('["x" :x x]')
+        self.assertEqual('["x" :x x]', codec.decode(codec.encode(value)).readable_str())
+
+    def test_memoryview(self):
+        data = bytearray(b"\0\0" + codec.encode(self.read('{:a "b"}')))
+        self.assertEqual('{:a "b"}', codec.decode(memoryview(data)[2:]).readable_str())
+
+    def test_deep_nesting(self):
+        value = MalList([])
+        for _ in range(10000):
+            value = MalList([value, MalInt(1)])
+        decoded = codec.decode(codec.encode(value))
+        for _ in range(10000):
+            decoded = decoded.native()[0]
+        self.assertEqual("()", decoded.readable_str())
+
+    def test_invalid(self):
+        data = codec.encode(self.read("[1 2 3]"))
+        with self.assertRaises(MalSyntaxException):
+            codec.decode(data[:-1])
+        with self.assertRaises(MalSyntaxException):
+            codec.decode(data + b"\0")
+        with self.assertRaises(MalSyntaxException):
+            codec.decode(b"")
+        with self.assertRaises(MalInvalidArgumentException):
+            codec.encode(self.rep_value("(atom 1)"))
+
+    def test_core_functions(self):
+        self.assertEqual(
+            '[1 "two" :three]', self.rep('(decode (encode [1 "two" :three]))')
+        )
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(decode "not bytes")')
+
+    def test_lispy(self):
+        lispy = Lispy()
+        data = lispy.encode(lispy.eval("{:a [1 2]}"))
+        self.assertIsInstance(data, bytes)
+        self.assertEqual("{:a [1 2]}", lispy.decode(data).readable_str())
+
+
+if __name__ == "__main__":
+    unittest.main()
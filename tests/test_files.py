@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from lispy import Lispy, rep
+from lispy.mal_types import (
+    LAZY_CHUNK_SIZE,
+    MalInt,
+    MalInvalidArgumentException,
+    MalLazySeq,
+    MalStringView,
+    MalUnknownSymbolException,
+)
+
+
+class TestFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmpdir.name)
+        self._cwd = os.getcwd()
+        os.chdir(self.dir)
+        self._repl_env = rep.init_repl_env(argv=[])
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmpdir.cleanup()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_line_seq(self):
+        (self.dir / "log.txt").write_text("alpha\nbeta\ngamma")
+        self.assertEqual(
+            '("alpha" "beta" "gamma")',
+            self.rep('(with-open [f (open "log.txt")] (apply list (line-seq f)))'),
+        )
+        self.assertEqual(
+            '"beta"', self.rep('(with-open [f (open "log.txt")] (nth (line-seq f) 1))'),
+        )
+        self.assertEqual('("a" "" "b")', self.rep('(line-seq "a\\n\\nb\\n")'))
+        self.assertEqual("nil", self.rep('(seq (line-seq ""))'))
+
+    def test_with_open_closes(self):
+        (self.dir / "a.txt").write_text("a")
+        self.rep('(def! f (with-open [f (open "a.txt")] f))')
+        self.assertTrue(rep.EVAL(rep.READ("f"), self._repl_env).native().closed)
+        self.rep(
+            '(def! g (try* (with-open [g (open "a.txt")] (throw g)) (catch* e e)))'
+        )
+        self.assertTrue(rep.EVAL(rep.READ("g"), self._repl_env).native().closed)
+        self.assertEqual("nil", self.rep('(with-open [h (open "a.txt")])'))
+
+    def test_file_attributes(self):
+        class Rec:
+            name = "rec"
+
+        (self.dir / "hostname").write_text("host\n")
+        lispy = Lispy(injections={"r": Rec()}, restrictions={Rec: ["name"]})
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval(
+                '(let* [f (open "hostname") cls (. f \'__class__)'
+                " mro ($ (. cls '__mro__)) base (nth mro (- (count mro) 1))]"
+                " (count ($ ((. base '__subclasses__)))))"
+            )
+        read = lispy.eval('(with-open [f (open "hostname")] ($ ((. f \'readline))))')
+        self.assertEqual('"host\\n"', read.readable_str())
+        with self.assertRaises(MalInvalidArgumentException):
+            Lispy().eval('(with-open [f (open "hostname")] (. f \'_CHUNK_SIZE))')
+
+    def test_spit(self):
+        self.rep('(spit "out.txt" "one\\n")')
+        self.rep('(spit "out.txt" [2 "three"] :append true)')
+        self.assertEqual("one\n[2 three]", (self.dir / "out.txt").read_text())
+        self.rep('(spit "out.txt" "new")')
+        self.assertEqual('"new"', self.rep('(slurp "out.txt")'))
+
+    def test_slurp_mmap(self):
+        (self.dir / "big.txt").write_text("héllo\nworld\n", encoding="utf-8")
+        view = rep.EVAL(
+            rep.READ('(slurp "big.txt" :mmap true :encoding "utf-8")'), self._repl_env,
+        )
+        self.assertIsInstance(view, MalStringView)
+        self.assertEqual(
+            '("héllo" "world")', self.rep('(line-seq (slurp "big.txt" :mmap true))')
+        )
+        self.assertEqual(
+            "true", self.rep('(= (slurp "big.txt" :mmap true) (slurp "big.txt"))'),
+        )
+        (self.dir / "empty.txt").write_text("")
+        self.assertEqual('""', self.rep('(slurp "empty.txt" :mmap true)'))
+        # Views are strings for compare and the codec
+        self.rep('(def! v (slurp "big.txt" :mmap true))')
+        self.assertEqual("1", self.rep('(compare v "abc")'))
+        self.assertEqual("0", self.rep('(compare (slurp "big.txt") v)'))
+        self.assertEqual("true", self.rep("(= v (decode (encode v)))"))
+
+    def test_lazy_seq(self):
+        read = []
+
+        def numbers():
+            for i in range(1000):
+                read.append(i)
+                yield MalInt(i)
+
+        seq = MalLazySeq(numbers())
+        self.assertEqual([], read)
+        self.assertEqual(MalInt(2), seq.rest().rest().first())
+        self.assertEqual(LAZY_CHUNK_SIZE, len(read))
+        # Items are read once and shared between rests and copies
+        self.assertEqual(MalInt(0), seq.copy().first())
+        self.assertEqual(1000, len(seq.native()))
+        self.assertEqual(1000, len(read))
+        self.assertEqual(999, len(seq.rest().native()))
+        self.assertTrue(MalLazySeq([]).empty())
+
+    def test_restricted(self):
+        env = rep.init_repl_env(restricted=True)
+        for name in ("slurp", "spit", "open", "line-seq", "with-open*"):
+            with self.assertRaises(MalUnknownSymbolException):
+                rep.rep(f"({name})", env)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from lispy import Lispy, OutputSink
+from lispy.env import ExecutionLimit
+from lispy.mal_types import (
+    MalExecutionLimitError,
+    MalInvalidArgumentException,
+    MalUnknownSymbolException,
+)
+
+
+class TestFunction(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lispy = Lispy(output=OutputSink.capture())
+        self.lispy.eval("(def! double (fn* [x] (* x 2)))")
+
+    def test_call(self):
+        double = self.lispy.function("double")
+        self.assertEqual(42, double(21))
+        self.lispy.eval("(def! negate (fn* [x] (- 0 x)))")
+        key = self.lispy.function("negate")
+        self.assertEqual([3, 2, 1], sorted([2, 3, 1], key=key))
+        self.assertEqual(2, self.lispy.function("count")([1, 2]))
+        self.assertEqual("double", double.__name__)
+
+    def test_conversions(self):
+        self.lispy.eval('(def! f (fn* [xs m s] [(count xs) (get m "a") s nil]))')
+        f = self.lispy.function("f")
+        self.assertEqual([3, [1], "s", None], f((1, 2, 3), {"a": [1]}, "s"))
+        self.lispy.eval("(def! total (fn* [xs] (reduce + 0 xs)))")
+        self.assertEqual(6, self.lispy.function("total")(iter([1, 2, 3])))
+
+    def test_resolved_once(self):
+        double = self.lispy.function("double")
+        self.lispy.eval("(def! double (fn* [x] x))")
+        self.assertEqual(4, double(2))
+
+    def test_not_a_function(self):
+        self.lispy.eval("(def! x 1)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.lispy.function("x")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.lispy.function("cond")
+        with self.assertRaises(MalUnknownSymbolException):
+            self.lispy.function("missing")
+
+    def test_output_flushed(self):
+        self.lispy.eval('(def! hello (fn* [name] (println "hello" name)))')
+        self.assertIsNone(self.lispy.function("hello")("world"))
+        self.assertEqual("hello world\n", self.lispy.output.getvalue())
+
+    def test_execution_limit(self):
+        lispy = Lispy(execution_limit=ExecutionLimit(0.1))
+        lispy.eval("(def! forever (fn* [] (forever)))")
+        with self.assertRaises(MalExecutionLimitError):
+            lispy.function("forever")()
+
+
+if __name__ == "__main__":
+    unittest.main()
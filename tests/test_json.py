@@ -0,0 +1,74 @@
+import io
+import unittest
+
+from lispy import rep
+from lispy.mal_types import (
+    MalInvalidArgumentException,
+    MalLazySeq,
+    MalPythonObject,
+    MalSyntaxException,
+)
+
+
+class TestJson(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def rep_value(self, input: str):
+        return rep.EVAL(rep.READ(input), self._repl_env)
+
+    def test_read(self):
+        self.assertEqual(
+            '{"a" [1 2.5 true false nil "x"] "b" {}}',
+            self.rep(
+                '(json-read "{\\"a\\": [1, 2.5, true, false, null, \\"x\\"], '
+                '\\"b\\": {}}")'
+            ),
+        )
+        self.assertEqual(
+            "[{:a 1} {:a 2}]",
+            self.rep('(json-read "[{\\"a\\": 1}, {\\"a\\": 2}]" :keywordize true)'),
+        )
+        self.assertEqual('"s"', self.rep('(json-read "\\"s\\"")'))
+
+    def test_keys_interned(self):
+        value = self.rep_value(
+            '(json-read "[{\\"a\\": 1}, {\\"a\\": 2}]" :keywordize true)'
+        )
+        first, second = (list(m.native()) for m in value.native())
+        self.assertIs(first[0], second[0])
+
+    def test_read_file(self):
+        self._repl_env.set("f", MalPythonObject(io.StringIO('{"a": [1]}')))
+        self.assertEqual("{:a [1]}", self.rep("(json-read f :keywordize true)"))
+
+    def test_invalid(self):
+        with self.assertRaises(MalSyntaxException):
+            self.rep('(json-read "[1,")')
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(json-read 1)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(json-write [(atom 1)])")
+
+    def test_write(self):
+        self.assertEqual(
+            '"{\\"a\\": [1, 2.5, true, null, \\"x\\"], \\"b\\": {}}"',
+            self.rep('(json-write {:a (list 1 2.5 true nil "x") "b" {}})'),
+        )
+        self.assertEqual('"[\\n  1\\n]"', self.rep("(json-write [1] :indent 2)"))
+
+    def test_lines(self):
+        stream = io.StringIO('{"id": 1}\n\n{"id": 2}\n')
+        self._repl_env.set("f", MalPythonObject(stream))
+        value = self.rep_value("(json-lines f :keywordize true)")
+        self.assertIsInstance(value, MalLazySeq)
+        self.assertEqual(0, stream.tell())
+        self.assertEqual("({:id 1} {:id 2})", value.readable_str())
+        self.assertEqual('(1 [2] "x")', self.rep('(json-lines "1\\n[2]\\n\\"x\\"")'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from lispy import rep
+from lispy.mal_types import MalException, MalSyntaxException
+
+
+class TestMacros(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_thread_first(self):
+        self.assertEqual(
+            "(rest (first x))", self.rep("(macroexpand (-> x first rest))")
+        )
+        self.assertEqual("7", self.rep("(-> 10 (- 2) (- 1))"))
+        self.assertEqual("3", self.rep("(-> [1 2 3] rest rest first)"))
+
+    def test_thread_last(self):
+        self.assertEqual("11", self.rep("(->> 10 (- 2) (- 3))"))
+
+    def test_thread_as(self):
+        self.assertEqual("[0 2]", self.rep("(as-> 1 x (+ x 1) (vector 0 x))"))
+
+    def test_cond_thread(self):
+        self.assertEqual("11", self.rep("(cond-> 1 true (+ 10) false (* 5))"))
+        with self.assertRaises(MalSyntaxException):
+            self.rep("(cond-> 1 true)")
+
+    def test_and_or(self):
+        self.assertEqual("true", self.rep("(and)"))
+        self.assertEqual("3", self.rep("(and 1 2 3)"))
+        self.assertEqual("nil", self.rep("(and 1 nil 3)"))
+        self.assertEqual("nil", self.rep("(or)"))
+        self.assertEqual("2", self.rep("(or false 2 3)"))
+        self.rep("(def! n (atom 0))")
+        self.assertEqual("1", self.rep("(or (swap! n + 1) false)"))
+        self.assertEqual("1", self.rep("@n"))
+
+    def test_when(self):
+        self.assertEqual("2", self.rep("(when true 1 2)"))
+        self.assertEqual("nil", self.rep("(when false 1)"))
+        self.assertEqual("nil", self.rep("(when-not true 1)"))
+        self.assertEqual("1", self.rep("(when-not false 1)"))
+        self.assertEqual("nil", self.rep("(when true)"))
+        self.assertEqual("nil", self.rep("(when-not false)"))
+
+    def test_if_let(self):
+        self.assertEqual("2", self.rep("(if-let [x (first [1])] (+ x 1) :none)"))
+        self.assertEqual(":none", self.rep("(if-let [x (first [])] x :none)"))
+        self.assertEqual("nil", self.rep("(if-let [x false] x)"))
+
+    def test_cond(self):
+        self.assertEqual(
+            "(if a 1 (if b 2 nil))", self.rep("(macroexpand (cond a 1 b 2))")
+        )
+        with self.assertRaises(MalException):
+            self.rep("(cond true)")
+
+    def test_native_macros(self):
+        self.assertEqual("true", self.rep("(macro? ->)"))
+        self.rep("(defmacro! or (fn* (& xs) :redefined))")
+        self.assertEqual(":redefined", self.rep("(or 1)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from lispy import Lispy, rep
+from lispy.cache import Cache, LFU
+from lispy.mal_types import MalInvalidArgumentException
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = Cache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)
+        self.assertIs(Cache.MISSING, cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual(1, cache.stats.evictions)
+
+    def test_lfu_eviction(self):
+        cache = Cache(max_size=2, policy=LFU)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.put("c", 3)
+        self.assertIs(Cache.MISSING, cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        cache.put("d", 4)
+        self.assertIs(Cache.MISSING, cache.get("c"))
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = Cache(ttl=1.0, clock=clock)
+        cache.put("a", 1)
+        clock.now = 0.5
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        clock.now = 1.2
+        self.assertIs(Cache.MISSING, cache.get("a"))
+        self.assertEqual(2, cache.get("b"))
+        clock.now = 2.0
+        cache.put("c", 3)
+        self.assertEqual(1, len(cache))
+
+    def test_lower_max_size(self):
+        cache = Cache(max_size=3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.max_size = 1
+        cache.put("d", "d")
+        self.assertEqual(1, len(cache))
+        self.assertEqual(3, cache.stats.evictions)
+        with self.assertRaises(ValueError):
+            cache.max_size = 0
+        self.assertEqual(1, cache.max_size)
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_memoize_recursive(self):
+        self.rep("(def! fib (fn* (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))")
+        self.rep("(def! fib (memoize fib))")
+        self.assertEqual("832040", self.rep("(fib 30)"))
+        self.assertEqual(
+            "{:hits 28 :misses 31 :size 31 :evictions 0}",
+            self.rep("(memoize-stats fib)"),
+        )
+
+    def test_memoize_structural_keys(self):
+        self.rep("(def! calls (atom 0))")
+        self.rep("(def! f (memoize (fn* (m) (do (swap! calls + 1) (count m)))))")
+        self.rep('(f [1 {"a" (list 2 3)}])')
+        self.assertEqual("2", self.rep('(f (list 1 {"a" [2 3]}))'))
+        self.assertEqual("1", self.rep("@calls"))
+        self.rep('(f [1 {"a" (list 2 4)}])')
+        self.assertEqual("2", self.rep("@calls"))
+
+    def test_memoize_max_size(self):
+        self.rep("(def! f (memoize (fn* (x) (* x 2)) :max-size 2 :policy :lfu))")
+        self.rep("(do (f 1) (f 1) (f 2) (f 3))")
+        self.assertEqual("6", self.rep("(f 3)"))
+        self.assertEqual(
+            "{:hits 2 :misses 3 :size 2 :evictions 1}", self.rep("(memoize-stats f)"),
+        )
+
+    def test_memoize_clear(self):
+        self.rep("(def! f (memoize (fn* (x) x)))")
+        self.rep("(f 1)")
+        self.assertEqual("nil", self.rep("(memoize-clear! f)"))
+        self.assertEqual("0", self.rep("(get (memoize-stats f) :size)"))
+
+    def test_memoize_invalid_options(self):
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(memoize (fn* (x) x) :policy :fifo)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(memoize (fn* (x) x) :max-size 0)")
+        for ttl in ("0", "-1", "0.0", '"10"'):
+            with self.assertRaises(MalInvalidArgumentException):
+                self.rep(f"(memoize (fn* (x) x) :ttl-ms {ttl})")
+        self.rep("(memoize (fn* (x) x) :ttl-ms 0.5)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(memoize-stats (fn* (x) x))")
+
+    def test_lispy_memoized(self):
+        lispy = Lispy()
+        lispy.eval("(def! square (memoize (fn* (x) (* x x))))")
+        lispy.eval("(square 3)")
+        lispy.eval("(square 3)")
+        stats = lispy.memoize_stats("square")
+        self.assertEqual((1, 1, 1), (stats.hits, stats.misses, stats.size))
+        lispy.clear_memoized("square")
+        self.assertEqual(0, lispy.memoize_stats("square").size)
+
+
+if __name__ == "__main__":
+    unittest.main()
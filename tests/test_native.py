@@ -4,11 +4,27 @@ import os
 from pathlib import Path
 import logging
 import unittest
+import collections.abc
 import functools
+import itertools
 import dataclasses
+import types
+import weakref
 from urllib.parse import urlparse
 
-from lispy import rep
+from lispy import Lispy, calling_convention, rep
+from lispy.mal_types import (
+    LAZY_CHUNK_SIZE,
+    UNRESTRICTED,
+    AccessPolicy,
+    MalBytes,
+    MalExpression,
+    MalIndexError,
+    MalInt,
+    MalInvalidArgumentException,
+    NativeSequenceView,
+    expression_from_native,
+)
 from tests.runner import Runner
 from tests.test_mal import TEST_DIR
 
@@ -108,5 +124,284 @@ class TestNative(Runner):
                 os.chdir(cwd)
 
 
+class Employee(Person):
+    def __init__(self, name: Name, address: Address, employer: str):
+        super().__init__(name, address)
+        self.employer = employer
+
+
+class TestAccessPolicy(unittest.TestCase):
+    def test_subclasses(self):
+        employee = Employee(p1.name, p1.address, "Acme")
+        restrictions = {Person: ["name"], Employee: ["employer"], Name: ["family"]}
+        lispy = Lispy(injections={"e": employee}, restrictions=restrictions)
+        self.assertEqual('"Acme"', lispy.eval("($ (. e 'employer))").readable_str())
+        family = lispy.eval("($ (. (. e 'name) 'family))")
+        self.assertEqual('"Duck"', family.readable_str())
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval("(. e 'address)")
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval("(. (. e 'name) 'given)")
+
+    def test_policy_shared(self):
+        policy = AccessPolicy({Person: ["name"]})
+        obj = expression_from_native(p1, policy)
+        self.assertIs(policy, obj.dot("name", None).restrictions)
+        self.assertEqual(frozenset(["name"]), policy.allowed(Employee))
+        self.assertIs(UNRESTRICTED, AccessPolicy.of({}))
+        self.assertIs(policy, AccessPolicy.of(policy))
+
+
+class TestSharedWrappers(unittest.TestCase):
+    def person(self) -> Person:
+        return Person(Name(given="Huey", family="Duck"), p1.address)
+
+    def test_identity(self):
+        injections = {"p": self.person()}
+        lispy = Lispy(injections=injections, share_wrappers=True)
+        name = lispy.eval("(. p 'name)")
+        self.assertIs(name, lispy.eval("(. p 'name)"))
+        self.assertIsNot(name, Lispy(injections=injections).eval("(. p 'name)"))
+
+    def test_primitives(self):
+        injections = {"p": self.person(), "f": len}
+        lispy = Lispy(injections=injections, share_wrappers=True)
+        family = lispy.eval("(. (. p 'name) 'family)")
+        self.assertEqual('"Duck"', family.readable_str())
+        self.assertEqual("2", lispy.eval('(f "ab")').readable_str())
+        # $ passes through values that were already converted
+        family = lispy.eval("($ (. (. p 'name) 'family))")
+        self.assertEqual('"Duck"', family.readable_str())
+        with self.assertRaises(MalInvalidArgumentException):
+            Lispy(injections=injections).eval('($ "Duck")')
+
+    def test_restrictions(self):
+        lispy = Lispy(
+            injections={"p": self.person()},
+            restrictions={Person: ["name"], Name: ["family"]},
+            share_wrappers=True,
+        )
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval("(. (. p 'name) 'given)")
+        self.assertIs(lispy.access_policy, lispy.eval("(. p 'name)").restrictions)
+
+
+class Recorded(collections.abc.Sequence):
+    """A sequence that records which items are read."""
+
+    def __init__(self, items: List[object]):
+        self.items = items
+        self.read: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index):
+        self.read.append(index)
+        return self.items[index]
+
+
+class TestViews(unittest.TestCase):
+    def test_sequence(self):
+        rows = Recorded(list(range(1000)))
+        lispy = Lispy(injections={"rows": rows}, share_wrappers=True)
+        self.assertEqual("1000", lispy.eval("(count ($ rows))").readable_str())
+        self.assertEqual("500", lispy.eval("(nth ($ rows) 500)").readable_str())
+        self.assertEqual("999", lispy.eval("(nth ($ rows) -1)").readable_str())
+        third = lispy.eval("(first (rest (rest ($ rows))))")
+        self.assertEqual("2", third.readable_str())
+        self.assertEqual([500, 999, 2], rows.read)
+        with self.assertRaises(MalIndexError):
+            lispy.eval("(nth ($ rows) 1000)")
+
+    def test_sequence_functions(self):
+        lispy = Lispy(injections={"t": (1, 2, 3)}, share_wrappers=True)
+        mapped = lispy.eval("(map (fn* [x] (+ x 1)) ($ t))")
+        self.assertEqual("(2 3 4)", mapped.readable_str())
+        self.assertEqual("(1 2 3)", lispy.eval("($ t)").readable_str())
+        self.assertEqual("true", lispy.eval("(= '(1 2 3) ($ t))").readable_str())
+        self.assertEqual("true", lispy.eval("(list? ($ t))").readable_str())
+        empty = lispy.eval("(seq (rest (rest (rest ($ t)))))")
+        self.assertEqual("nil", empty.readable_str())
+        self.assertEqual("(0 1 2 3)", lispy.eval("(cons 0 ($ t))").readable_str())
+
+    def test_mapping(self):
+        data = {"name": "Huey", "tags": ["a", "b"], "n": None}
+        lispy = Lispy(injections={"d": types.MappingProxyType(data)})
+        self.assertEqual("3", lispy.eval("(count ($ d))").readable_str())
+        keys = lispy.eval("(keys ($ d))")
+        self.assertEqual('("name" "tags" "n")', keys.readable_str())
+        self.assertEqual('"Huey"', lispy.eval('($ (get ($ d) "name"))').readable_str())
+        tags = lispy.eval('(count ($ (get ($ d) "tags")))')
+        self.assertEqual("2", tags.readable_str())
+        self.assertEqual("nil", lispy.eval('(get ($ d) "other")').readable_str())
+        self.assertEqual('"Huey"', lispy.eval("($ (get ($ d) :name))").readable_str())
+        self.assertEqual("true", lispy.eval("(contains? ($ d) :n)").readable_str())
+        self.assertEqual("true", lispy.eval('(contains? ($ d) "n")').readable_str())
+        self.assertEqual("true", lispy.eval("(map? ($ d))").readable_str())
+        lispy = Lispy(injections={"d": {1: "a", "b": 2}})
+        self.assertEqual("2", lispy.eval('($ (get ($ d) "b"))').readable_str())
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval("(keys ($ d))")
+
+    def test_mapping_equality(self):
+        lispy = Lispy(injections={"d": {"a": 1}}, share_wrappers=True)
+        self.assertEqual('{"a" 1}', lispy.eval("($ d)").readable_str())
+        self.assertEqual("true", lispy.eval('(= {"a" 1} ($ d))').readable_str())
+        self.assertEqual("true", lispy.eval('(= ($ d) {"a" 1})').readable_str())
+        assoc = lispy.eval('(assoc ($ d) "b" 2)')
+        self.assertEqual('{"a" 1 "b" 2}', assoc.readable_str())
+
+    def test_bytes(self):
+        lispy = Lispy(injections={"b": b"abc"})
+        self.assertIsInstance(lispy.eval("($ b)"), MalBytes)
+
+
+def counter(read: List[int]):
+    """Yield 0, 1, 2 ... recording each item read."""
+    for i in itertools.count():
+        read.append(i)
+        yield i
+
+
+class TestIterables(unittest.TestCase):
+    def test_lazy(self):
+        read: List[int] = []
+        lispy = Lispy(injections={"c": counter(read)}, share_wrappers=True)
+        lispy.eval("(def! s ($ c))")
+        self.assertEqual("(0 1 2)", lispy.eval("(take 3 s)").readable_str())
+        self.assertEqual(LAZY_CHUNK_SIZE, len(read))
+        doubled = lispy.eval("(take 2 (map (fn* [x] (* x 2)) (rest s)))")
+        self.assertEqual("(2 4)", doubled.readable_str())
+
+    def test_single_pass(self):
+        lispy = Lispy(injections={"g": iter(range(100))}, share_wrappers=True)
+        lispy.eval("(def! s ($ g))")
+        # A second seq would miss the items read by the first
+        with self.assertRaises(MalInvalidArgumentException):
+            lispy.eval("($ g)")
+        self.assertEqual("4950", lispy.eval("(reduce + s)").readable_str())
+        self.assertEqual("4950", lispy.eval("(reduce + 0 s)").readable_str())
+
+    def test_bounded_memory(self):
+        class Item:
+            pass
+
+        live: weakref.WeakSet = weakref.WeakSet()
+        most = []
+
+        def items(n: int):
+            for _ in range(n):
+                item = Item()
+                live.add(item)
+                yield item
+
+        def step(total: int, item: object) -> int:
+            most.append(len(live))
+            return total + 1
+
+        lispy = Lispy(injections={"items": items, "step": step})
+        for expr in (
+            "(reduce step 0 ($ (items 1000)))",
+            "(reduce step 0 (take 900 (map (fn* [x] x) ($ (items 1000)))))",
+        ):
+            most.clear()
+            lispy.eval(expr)
+            # Items are released as they are reduced, not held until the end
+            self.assertLessEqual(max(most), 2 * LAZY_CHUNK_SIZE)
+
+    def test_iterable(self):
+        lispy = Lispy(injections={"s": frozenset([2])}, share_wrappers=True)
+        self.assertEqual("(2)", lispy.eval("($ s)").readable_str())
+        self.assertEqual("(2)", lispy.eval("($ s)").readable_str())
+
+    def test_reduce(self):
+        env = rep.init_repl_env()
+        self.assertEqual("6", rep.rep("(reduce + [1 2 3])", env))
+        self.assertEqual("16", rep.rep("(reduce + 10 '(1 2 3))", env))
+        self.assertEqual("5", rep.rep("(reduce + [5])", env))
+        self.assertEqual("0", rep.rep("(reduce (fn* [& xs] (count xs)) nil)", env))
+        self.assertEqual("7", rep.rep("(reduce + 7 [])", env))
+        with self.assertRaises(MalInvalidArgumentException):
+            rep.rep("(reduce 1 [])", env)
+        # Only the evaluator hands over its args
+        args = [env.get("+"), rep.READ("[1 2]")]
+        self.assertEqual(MalInt(3), env.get("reduce").call(args))
+        self.assertEqual(2, len(args))
+        # Only the evaluator hands over its args
+        args = [env.get("+"), rep.READ("[1 2]")]
+        self.assertEqual(MalInt(3), env.get("reduce").call(args))
+        self.assertEqual(2, len(args))
+
+    def test_take(self):
+        env = rep.init_repl_env()
+        self.assertEqual("(1 2)", rep.rep("(take 2 [1 2 3])", env))
+        self.assertEqual("(1 2 3)", rep.rep("(take 5 '(1 2 3))", env))
+        self.assertEqual("()", rep.rep("(take -1 [1 2 3])", env))
+        self.assertEqual("()", rep.rep("(take 2 nil)", env))
+
+
+@calling_convention("views")
+def describe(value):
+    return type(value).__name__
+
+
+@calling_convention("mal")
+def mal_count(args: List[MalExpression]) -> MalExpression:
+    return MalInt(len(args))
+
+
+class TestCallingConventions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lispy = Lispy(
+            injections={
+                "describe": describe,
+                "mal_count": mal_count,
+                "native": lambda *args, **kwargs: [args, kwargs],
+                "data": [1, 2],
+            }
+        )
+
+    def eval(self, expr: str) -> str:
+        return self.lispy.eval(expr).readable_str()
+
+    def test_native(self):
+        self.assertEqual(
+            repr(repr([([1, "a"], [2]), {"k": {"b": None}}])),
+            self.eval('(native [1 "a"] \'(2) :k {"b" nil})'),
+        )
+        with self.assertRaises(MalInvalidArgumentException):
+            self.eval("(native 1 :k)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.eval("(native :k 1 :k 2)")
+
+    def test_views(self):
+        self.assertEqual("\"'NativeSequenceView'\"", self.eval("(describe [1 2])"))
+        self.assertEqual("\"'NativeMappingView'\"", self.eval("(describe {:a 1})"))
+        self.assertEqual("\"'int'\"", self.eval("(describe 1)"))
+        # Views of Python collections are passed back unwrapped
+        self.assertEqual("\"'list'\"", self.eval("(describe ($ data))"))
+
+    def test_view_contents(self):
+        view = NativeSequenceView(self.lispy.eval('[1 [2] {"a" 3 :b 4}]').native())
+        self.assertEqual(3, len(view))
+        self.assertEqual(1, view[0])
+        self.assertEqual([2], list(view[1]))
+        self.assertEqual({"a": 3, "b": 4}, dict(view[2]))
+        both = NativeSequenceView(self.lispy.eval('[{"a" 1 :a 2 :b 3}]').native())[0]
+        self.assertEqual(["a", "b"], list(both))
+        self.assertEqual({"a": 1, "b": 3}, dict(both))
+        self.assertEqual(2, len(view[1:]))
+        with self.assertRaises(KeyError):
+            view[2]["c"]
+
+    def test_mal(self):
+        self.assertEqual("3", self.eval("(mal_count 1 :k [2])"))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            calling_convention("other")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,54 @@
+import io
+import unittest
+from unittest import mock
+
+from lispy import Lispy, OutputSink
+from lispy.mal_types import MalExecutionLimitError
+
+
+class TestOutput(unittest.TestCase):
+    def test_capture(self):
+        with Lispy(output=OutputSink.capture()) as lispy:
+            lispy.eval('(do (prn "a" 1) (println "b" 2) (pprint [1 2]))')
+            self.assertEqual('"a" 1\nb 2\n[1 2]\n', lispy.output.getvalue())
+
+    def test_instances_are_separate(self):
+        first = Lispy(output=OutputSink.capture())
+        second = Lispy(output=OutputSink.capture())
+        first.eval("(println 1)")
+        second.eval("(println 2)")
+        self.assertEqual("1\n", first.output.getvalue())
+        self.assertEqual("2\n", second.output.getvalue())
+
+    def test_buffering(self):
+        stream = mock.Mock(wraps=io.StringIO())
+        lispy = Lispy(output=OutputSink(stream, buffer_size=1024))
+        lispy.eval("(do (println 1) (println 2) (println 3))")
+        stream.write.assert_called_once_with("1\n2\n3\n")
+
+    def test_flushed_on_error(self):
+        lispy = Lispy(output=OutputSink.capture())
+        lispy.output.buffer_size = 1024
+        with self.assertRaises(Exception):
+            lispy.eval('(do (println "before") (throw "oops"))')
+        self.assertEqual("before\n", lispy.output.getvalue())
+
+    def test_quota(self):
+        lispy = Lispy(output=OutputSink.capture(max_bytes=10))
+        with self.assertRaises(MalExecutionLimitError):
+            lispy.eval('(println "héllo" "world")')
+        lispy.eval('(println "héllo")')
+        self.assertEqual("héllo\n", lispy.output.getvalue())
+        # The quota applies to each evaluation
+        lispy.eval('(println "héllo")')
+        with self.assertRaises(MalExecutionLimitError):
+            lispy.eval('(do (println "héllo") (println "héllo"))')
+
+    def test_default_prints(self):
+        with mock.patch("lispy.core.python_print") as mock_print:
+            Lispy().eval('(println "x")')
+        mock_print.assert_called_once_with("x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import threading
+
+from lispy import Lispy, WorkerPool, rep
+from lispy.mal_types import MalException, MalInvalidArgumentException
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_pmap(self):
+        self.assertEqual("(2 4 6)", self.rep("(pmap (fn* (x) (* 2 x)) [1 2 3])"))
+        self.assertEqual("()", self.rep("(pmap (fn* (x) x) nil)"))
+
+    def test_pcalls(self):
+        self.assertEqual("(1 2)", self.rep("(pcalls (fn* () 1) (fn* () (+ 1 1)))"))
+
+    def test_pvalues(self):
+        self.assertEqual("(3 :a)", self.rep("(pvalues (+ 1 2) :a)"))
+
+    def test_exceptions(self):
+        with self.assertRaises(MalException) as cm:
+            self.rep('(pmap (fn* (x) (if (= x 2) (throw "two") x)) [1 2 3])')
+        self.assertEqual('"two"', str(cm.exception))
+        with self.assertRaises(MalException):
+            self.rep("(pmap (fn* (x) (/ 1 x)) [1 0])")
+
+    def test_nested(self):
+        pool = WorkerPool(max_workers=2)
+        with Lispy(worker_pool=pool) as lispy:
+            nested = "(pmap (fn* [x] (pmap (fn* [y] (* x y)) [1 2 3])) [1 2])"
+            self.assertEqual("((1 2 3) (2 4 6))", str(lispy.eval(nested)))
+            nested = "(pcalls (fn* [] (pvalues 1 2)) (fn* [] (pvalues 3)))"
+            self.assertEqual("((1 2) (3))", str(lispy.eval(nested)))
+        pool.shutdown()
+
+    def test_chunksize(self):
+        names = set()
+
+        def thread_name(x):
+            names.add(threading.current_thread().name)
+            return x * 10
+
+        pool = WorkerPool(max_workers=2, chunksize=5)
+        with Lispy(injections={"f": thread_name}, worker_pool=pool) as lispy:
+            self.assertEqual(
+                "(0 10 20 30 40 50 60 70 80 90)",
+                str(lispy.eval("(map $ (pmap f [0 1 2 3 4 5 6 7 8 9]))")),
+            )
+        self.assertLessEqual(len(names), 2)
+        pool.shutdown()
+
+    def test_process_pool(self):
+        pool = WorkerPool(kind="process", max_workers=2)
+        with Lispy(injections={"abs": abs}, worker_pool=pool) as lispy:
+            self.assertEqual("(1 2 3)", str(lispy.eval("(map $ (pmap abs [-1 2 -3]))")))
+            with self.assertRaises(MalInvalidArgumentException):
+                lispy.eval("(pmap (fn* (x) x) [1])")
+        pool.shutdown()
+
+    def test_lispy_close(self):
+        lispy = Lispy()
+        lispy.eval("(pmap (fn* (x) x) [1])")
+        lispy.close()
+        self.assertIsNone(lispy.worker_pool._executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from lispy import Lispy
+from lispy.cache import Cache
+from lispy.interpreter import parse_cache
+from lispy.mal_types import MalSyntaxException
+
+
+class TestParseCache(unittest.TestCase):
+    def test_shared_between_instances(self):
+        cache = Cache(max_size=8)
+        a = Lispy(injections={"x": 1}, parse_cache=cache)
+        b = Lispy(injections={"x": 2}, parse_cache=cache)
+        self.assertEqual(2, a.eval("(+ x 1)").native())
+        self.assertEqual(3, b.eval("(+ x 1)").native())
+        self.assertEqual((1, 1, 1, 0), tuple(cache.stats))
+
+    def test_default_cache(self):
+        lispy = Lispy()
+        self.assertIs(parse_cache, lispy.parse_cache)
+        source = "(str :parse-cache-default)"
+        lispy.eval(source)
+        self.assertIsNot(Cache.MISSING, parse_cache.get(source))
+
+    def test_syntax_error_not_cached(self):
+        cache = Cache(max_size=8)
+        lispy = Lispy(parse_cache=cache)
+        with self.assertRaises(MalSyntaxException):
+            lispy.eval("(+ 1")
+        self.assertEqual(0, len(cache))
+
+    def test_disabled(self):
+        lispy = Lispy(parse_cache=None)
+        self.assertEqual(3, lispy.eval("(+ 1 2)").native())
+
+
+if __name__ == "__main__":
+    unittest.main()
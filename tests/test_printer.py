@@ -0,0 +1,126 @@
+import io
+import unittest
+from unittest import mock
+
+from lispy import Lispy, printer, rep
+from lispy.mal_types import (
+    MalBytes,
+    MalInt,
+    MalInvalidArgumentException,
+    MalLazySeq,
+    MalList,
+    MalString,
+    MalVector,
+)
+
+
+class TestPrinter(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def read(self, input: str):
+        return rep.READ(input)
+
+    def test_pr_str_matches_readable_str(self):
+        value = self.read('(1 "a\\nb" [:k {"x" (2)}] nil true 1.5 sym)')
+        self.assertEqual(value.readable_str(), printer.pr_str(value))
+        self.assertEqual(value.unreadable_str(), printer.pr_str(value, readably=False))
+        self.assertEqual("(atom [1])", self.rep("(atom [1])"))
+
+    def test_deep_nesting(self):
+        value = MalList([])
+        for _ in range(10000):
+            value = MalList([value, MalInt(1)])
+        text = printer.pr_str(value)
+        self.assertTrue(text.startswith("((((("))
+        self.assertEqual(10001 * 2 + 10000, len(text) - text.count(" "))
+
+    def test_max_depth(self):
+        value = self.read("(1 (2 (3 (4))))")
+        self.assertEqual("(1 (2 #))", printer.pr_str(value, max_depth=2))
+        self.assertEqual("#", printer.pr_str(value, max_depth=0))
+
+    def test_max_length(self):
+        value = self.read("(1 [2 3 4] {:a 1 :b 2} ())")
+        self.assertEqual(
+            "(1 [2 3 4] {:a 1 :b 2} ...)", printer.pr_str(value, max_length=3)
+        )
+        self.assertEqual("(1 [2 3 ...] ...)", printer.pr_str(value, max_length=2))
+        self.assertEqual("(...)", printer.pr_str(value, max_length=0))
+        self.assertEqual("[1 2]", printer.pr_str(self.read("[1 2]"), max_length=2))
+
+    def test_max_chars(self):
+        value = self.read('[1 "a long string" 2]')
+        self.assertEqual('[1 "a l...', printer.pr_str(value, max_chars=7))
+        self.assertEqual('[1 "a long string" 2]', printer.pr_str(value, max_chars=21))
+
+    def test_limits_stop_printing(self):
+        def items():
+            for i in range(100):
+                yield MalInt(i)
+            raise AssertionError("printed past the limit")
+
+        value = MalLazySeq(items())
+        self.assertTrue(printer.pr_str(value, max_chars=50).endswith("..."))
+        self.assertEqual(
+            '"xxxx...', printer.pr_str(MalString("x" * 10 ** 6), max_chars=5)
+        )
+        data = MalBytes(bytes(10 ** 6))
+        self.assertEqual('(hex->bytes "000...', printer.pr_str(data, max_chars=16))
+        tokens = list(printer.tokens(data, max_string=5))
+        self.assertEqual(['(hex->bytes "00000...")'], tokens)
+
+    def test_rep_limits(self):
+        env = rep.init_repl_env(print_limits=printer.PrintLimits(max_length=2))
+        self.assertEqual("(0 1 ...)", rep.rep("(list 0 1 2 3)", env))
+        lispy = Lispy(print_limits=printer.PrintLimits(max_chars=5, max_depth=1))
+        self.assertEqual("[# #]", lispy.pr_str(lispy.eval("[[1] [2]]")))
+        self.assertEqual("[1 2 ...", lispy.pr_str(lispy.eval("[1 2 3 4]")))
+
+    def test_limited_errors(self):
+        env = rep.init_repl_env(print_limits=printer.PrintLimits(max_length=2))
+        message = rep.rep_handling_exceptions("(throw [1 2 3 4])", env, verbose=True)
+        self.assertTrue(message.startswith("ERROR: [1 2 ...]\n(throw [1 2 ...])\n"))
+
+    def test_invalid_argument_message(self):
+        value = MalVector([MalInt(1)] * 10000)
+        message = MalInvalidArgumentException(value, "not a map").native().native()
+        self.assertTrue(message.endswith("...: invalid argument: not a map"))
+        self.assertLess(len(message), printer.ARGUMENT_MAX_CHARS + 50)
+
+    def test_write_stream(self):
+        stream = io.StringIO()
+        printer.write(self.read('[1 "x"]'), stream)
+        self.assertEqual('[1 "x"]', stream.getvalue())
+
+    def test_pprint_fits(self):
+        self.assertEqual("[1 2 3]\n", printer.pformat(self.read("[1 2 3]")))
+
+    def test_pprint_breaks(self):
+        value = self.read('{:name "a long name" :items [1 2 3] :nested (x y)}')
+        self.assertEqual(
+            '{:name "a long name"\n :items [1 2 3]\n :nested (x y)}\n',
+            printer.pformat(value, width=30),
+        )
+        self.assertEqual(
+            "(defn\n foo\n [a b]\n (+ a b))\n",
+            printer.pformat(self.read("(defn foo [a b] (+ a b))"), width=10),
+        )
+
+    def test_pprint_depth(self):
+        value = self.read("[1 [2 [3]]]")
+        self.assertEqual("[1\n [2 #]]\n", printer.pformat(value, width=6, max_depth=2))
+
+    def test_pprint_core(self):
+        with mock.patch("lispy.core.python_print") as p:
+            self.rep("(pprint [[1 2] [3 4]] :width 8)")
+        self.assertEqual(
+            ["[[1 2]", " [3 4]]"], [call[0][0] for call in p.call_args_list]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import dataclasses
+
+from lispy import Lispy, rep
+from lispy.mal_types import MalInvalidArgumentException
+
+
+@dataclasses.dataclass
+class Shape:
+    size: int
+
+
+class Square(Shape):
+    pass
+
+
+class TestProtocols(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_type_of(self):
+        self.assertEqual(":mal/number", self.rep("(type-of 1.5)"))
+        self.assertEqual(":mal/function", self.rep("(type-of +)"))
+        self.assertEqual(":point", self.rep("(type-of ^{:type :point} {:x 1})"))
+
+    def test_protocol(self):
+        self.rep("(defprotocol Describe (describe [this]) (tag [this prefix]))")
+        self.rep(
+            """(extend-type :mal/string Describe
+                 (describe [this] (str "string " this))
+                 (tag [this prefix] (str prefix this)))"""
+        )
+        self.rep('(extend :mal/number Describe {:describe (fn* [n] "number")})')
+        self.assertEqual('"string a"', self.rep('(describe "a")'))
+        self.assertEqual('"<a"', self.rep('(tag "a" "<")'))
+        self.assertEqual('"number"', self.rep("(describe 2)"))
+        self.assertEqual("true", self.rep('(satisfies? Describe "a")'))
+        self.assertEqual("false", self.rep("(satisfies? Describe 2)"))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(describe :k)")
+
+    def test_extend_invalidates_cache(self):
+        self.rep("(defprotocol P (f [this]))")
+        self.rep("(extend-type :default P (f [this] :default))")
+        self.assertEqual(":default", self.rep("(f [1])"))
+        self.rep("(extend-type :mal/vector P (f [this] :vector))")
+        self.assertEqual(":vector", self.rep("(f [1])"))
+        self.assertEqual(":default", self.rep("(f '(1))"))
+
+    def test_meta_type(self):
+        self.rep("(defprotocol P (f [this]))")
+        self.rep("(extend-type :point P (f [this] (get this :x)))")
+        self.assertEqual("1", self.rep("(f ^{:type :point} {:x 1})"))
+
+    def test_python_types(self):
+        lispy = Lispy(injections={"square": Square(2), "shape": Shape(3)})
+        lispy.eval("(defprotocol Area (area [this]))")
+        lispy.eval("(extend-type :python/Shape Area (area [this] :shape))")
+        self.assertEqual(":shape", str(lispy.eval("(area square)")))
+        lispy.eval("(extend-type :python/Square Area (area [this] :square))")
+        self.assertEqual(":square", str(lispy.eval("(area square)")))
+        self.assertEqual(":shape", str(lispy.eval("(area shape)")))
+
+    def test_multimethods(self):
+        self.rep("(defmulti area (fn* [s] (get s :shape)))")
+        self.rep("(defmethod area :square [s] (* (get s :side) (get s :side)))")
+        self.rep("(defmethod area [:rect 1] [s] :unit-rect)")
+        self.rep("(defmethod area :default [s] nil)")
+        self.assertEqual("9", self.rep("(area {:shape :square :side 3})"))
+        self.assertEqual(":unit-rect", self.rep("(area {:shape '(:rect 1)})"))
+        self.assertEqual("nil", self.rep("(area {:shape :circle})"))
+
+    def test_multimethod_no_default(self):
+        self.rep("(defmulti f first)")
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(f [1])")
+
+
+if __name__ == "__main__":
+    unittest.main()
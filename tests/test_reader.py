@@ -0,0 +1,158 @@
+from __future__ import annotations
+from typing import Callable, Iterator, List, Union
+from pathlib import Path
+import unittest
+
+from lispy import reader, rep
+from lispy.mal_types import (
+    MalExpression,
+    MalBlank,
+    MalHash_map,
+    MalList,
+    MalVector,
+    MalSyntaxException,
+)
+
+MAL_DIR = Path(__file__).parent / "mal"
+
+
+def shape(value: MalExpression) -> object:
+    """Structure of value including types, for comparing reader output."""
+    if isinstance(value, (MalList, MalVector)):
+        return (type(value), [shape(v) for v in value.native()])
+    if isinstance(value, MalHash_map):
+        return (type(value), [(shape(k), shape(v)) for k, v in value.native().items()])
+    return (type(value), value.readable_str())
+
+
+def read_all(read: Callable[[], MalExpression]) -> List[object]:
+    forms: List[object] = []
+    while True:
+        try:
+            form = read()
+        except MalSyntaxException as e:
+            forms.append(str(e))
+            return forms
+        if isinstance(form, MalBlank):
+            return forms
+        forms.append(shape(form))
+
+
+def scan_all(lines: Union[str, Iterator[str]]) -> List[object]:
+    return read_all(reader.Scanner(lines).read_form)
+
+
+def reference_all(lines: Union[str, Iterator[str]]) -> List[object]:
+    tokens = reader.Tokenizer(lines)
+
+    def read() -> MalExpression:
+        if tokens.peek() is None:
+            return MalBlank()
+        return reader.Reader(tokens).read_form()
+
+    return read_all(read)
+
+
+class TestReader(unittest.TestCase):
+    CASES = [
+        "",
+        "  ;; comment only",
+        "(+ 1 2)",
+        "[1 -2 3.5 -.5 .5 1.2.3 - -abc a-b]",
+        '{"a" 1 :b [2 3]}',
+        '"a\\nb\\\\n\\"c\\t"',
+        '"unterminated',
+        '"trailing\\',
+        "'a `(b ~c ~@d) @e",
+        "^{:a 1} [1 2]",
+        "^sym (x)",
+        "a~b a~@b a^b x,y",
+        "(1 2",
+        "[1 (2]",
+        ")",
+        "{:a}",
+        "{1 2}",
+        "'",
+        "(1 ')",
+        "nil true false nilly :kw :",
+        "(abc ; comment\n def)",
+        "1 2 3",
+    ]
+
+    def assertSameRead(self, text: str):
+        expected = reference_all(text)
+        self.assertEqual(expected, scan_all(text), text)
+        # Lines keep their endings, so reading line by line gives the same forms
+        lines = text.splitlines(keepends=True)
+        self.assertEqual(expected, scan_all(iter(lines)), text)
+
+    def test_cases(self):
+        for text in self.CASES:
+            self.assertSameRead(text)
+
+    def test_mal_sources(self):
+        paths = sorted(MAL_DIR.rglob("*.mal"))
+        self.assertTrue(paths)
+        for path in paths:
+            text = path.read_text()
+            self.assertSameRead(text)
+            # Test files contain many reader error cases one per line
+            for line in text.splitlines():
+                self.assertSameRead(line)
+
+    def test_lines_without_newlines(self):
+        # The REPL passes lines without newlines, which separate tokens
+        self.assertEqual("(+ 1 2)", reader.read(iter(["(+ 1", "2)"])).readable_str())
+
+    def test_string_spans_lines(self):
+        lines = ['(str "a\n', "b\n", 'c")\n']
+        self.assertEqual('(str "a\\nb\\nc")', reader.read(iter(lines)).readable_str())
+        # An escape split across lines
+        lines = ['(str "a\\', 'nb" 1)']
+        self.assertEqual('(str "a\\nb" 1)', reader.read(iter(lines)).readable_str())
+        lines = ['"'] + ["x\n"] * 10000 + ['"']
+        self.assertEqual(20000, len(reader.read(iter(lines)).native()))
+
+    def test_iter_forms(self):
+        forms = reader.iter_forms(iter(["1 (2\n", "3) [4]\n"]))
+        self.assertEqual(["1", "(2 3)", "[4]"], [form.readable_str() for form in forms])
+
+    def test_positions(self):
+        text = '(a\n  [b {:c (d)}]\n "x\ny" (e))\n(f)'
+        for lines in (text, iter(text.splitlines(keepends=True))):
+            forms = list(reader.iter_forms(lines, "test.mal"))
+            a, vector, _, e = forms[0].native()
+            hash_map = vector.native()[1]
+            self.assertEqual(("test.mal", 1, 1), forms[0].position)
+            self.assertEqual(("test.mal", 2, 3), vector.position)
+            self.assertEqual(("test.mal", 2, 6), hash_map.position)
+            self.assertEqual(("test.mal", 4, 4), e.position)
+            self.assertEqual("test.mal:5:1", str(forms[1].position))
+
+    def test_no_positions(self):
+        self.assertIsNone(reader.read("(a [b])").position)
+
+    def test_read_seq(self):
+        env = rep.init_repl_env()
+        self.assertEqual("(1 (+ 2 3))", rep.rep('(read-seq "1 (+ 2 3)")', env))
+        self.assertEqual("()", rep.rep('(read-seq " ; none")', env))
+
+    def test_reads_lazily(self):
+        def lines() -> Iterator[str]:
+            yield "(a\n"
+            yield "b) (c\n"
+            raise AssertionError("read past end of form")
+
+        self.assertEqual("(a b)", reader.Scanner(lines()).read_form().readable_str())
+
+    def test_deep_nesting(self):
+        depth = 100000
+        value = reader.read("(" * depth + "x" + ")" * depth)
+        for _ in range(depth):
+            self.assertIsInstance(value, MalList)
+            value = value.native()[0]
+        self.assertEqual("x", value.readable_str())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import builtins
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from lispy import compiled, reader, rep
+from lispy.modules import module_cache
+from lispy.mal_types import MalException, MalUnknownSymbolException
+
+
+class TestRequire(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmpdir.name)
+        self._cwd = os.getcwd()
+        os.chdir(self.dir)
+        self._repl_env = rep.init_repl_env(argv=[])
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmpdir.cleanup()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def write(self, name: str, source: str) -> None:
+        (self.dir / name).write_text(source)
+
+    def test_require_once(self):
+        self.write("counter.mal", "(def! loads (+ 1 (try* loads (catch* e 0))))")
+        self.assertEqual("nil", self.rep('(require "counter.mal")'))
+        self.rep('(require "counter.mal")')
+        self.rep(f'(require "{self.dir / "counter.mal"}")')
+        self.assertEqual("1", self.rep("loads"))
+
+    def test_require_circular(self):
+        self.write("a.mal", '(require "b.mal")\n(def! a 1)')
+        self.write("b.mal", '(require "a.mal")\n(def! b 2)')
+        self.rep('(require "a.mal")')
+        self.assertEqual("3", self.rep("(+ a b)"))
+
+    def test_shared_parse_cache(self):
+        self.write("shared.mal", "(def! x 42)")
+        path = (self.dir / "shared.mal").resolve()
+        forms = module_cache.forms(path)
+        self.rep('(require "shared.mal")')
+        other_env = rep.init_repl_env(argv=[])
+        rep.rep('(require "shared.mal")', other_env)
+        self.assertIs(forms, module_cache.forms(path))
+        self.assertEqual("42", rep.rep("x", other_env))
+
+    def test_changed_module_reparsed(self):
+        self.write("changing.mal", "(def! x 1)")
+        path = (self.dir / "changing.mal").resolve()
+        forms = module_cache.forms(path)
+        self.write("changing.mal", "(def! x 22)")
+        os.utime(path, ns=(0, 0))
+        self.assertIsNot(forms, module_cache.forms(path))
+
+    def test_require_missing(self):
+        with self.assertRaises(MalException):
+            self.rep('(require "missing.mal")')
+
+    def test_load_file_evaluates_incrementally(self):
+        # The syntax error is only reached after the first form has run
+        self.write("partial.mal", '(def! x 1)\n(def! s "a\nb")\n(oops')
+        with self.assertRaises(MalException) as cm:
+            self.rep('(load-file "partial.mal")')
+        self.assertEqual('"a\\nb"', self.rep("s"))
+        self.assertIn(
+            "partial.mal: top level form 3", cm.exception.readable_backtrace()
+        )
+
+    def test_load_file_reports_failing_form(self):
+        self.write("failing.mal", "(def! x 1)\n(throw x)\n(def! y 2)")
+        opened = []
+
+        def tracked_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        real_open = builtins.open
+        with mock.patch("builtins.open", tracked_open):
+            with self.assertRaises(MalException) as cm:
+                self.rep('(load-file "failing.mal")')
+        self.assertTrue(opened)
+        self.assertTrue(all(f.closed for f in opened))
+        backtrace = cm.exception.readable_backtrace()
+        self.assertIn("failing.mal: top level form 2", backtrace)
+        self.assertIn("failing.mal:2:1: (throw x)", backtrace)
+        with self.assertRaises(MalUnknownSymbolException):
+            self.rep("y")
+
+    def test_load_file_missing(self):
+        with self.assertRaises(MalException):
+            self.rep('(load-file "missing.mal")')
+
+    def test_compiled_forms(self):
+        source = '(def! x [1 -2.5 "s" :k {:a nil} true])\n(def! y (quote sym))'
+        self.write("compiled.mal", source)
+        path = (self.dir / "compiled.mal").resolve()
+        module_cache.clear()
+        self.rep('(require "compiled.mal")')
+        malc = compiled.cache_path(path)
+        self.assertTrue(malc.exists())
+        forms = compiled.load(path, path.stat())
+        self.assertEqual(
+            [form.readable_str() for form in reader.iter_forms(source)],
+            [form.readable_str() for form in forms],
+        )
+        self.assertEqual((str(path), 2, 1), forms[1].position)
+
+        # Touching the source keeps the compiled forms, changing it does not
+        os.utime(path, ns=(0, 0))
+        self.assertIsNotNone(compiled.load(path, path.stat()))
+        # The new mtime was stored, so the source is not hashed again
+        with mock.patch.object(compiled, "file_digest", side_effect=AssertionError):
+            self.assertIsNotNone(compiled.load(path, path.stat()))
+        self.write("compiled.mal", source.replace("sym", "abc"))
+        self.assertIsNone(compiled.load(path, path.stat()))
+
+    def test_load_file_uses_compiled_forms(self):
+        self.write("loaded.mal", "(def! x 1)\n(def! y x)")
+        self.rep('(load-file "loaded.mal")')
+        path = self.dir / "loaded.mal"
+        self.assertIsNotNone(compiled.load(path, path.stat()))
+        # Replace the compiled forms, to check they are used
+        forms = list(reader.iter_forms("(def! x 2)\n(throw x)", "loaded.mal"))
+        st = path.stat()
+        compiled.dump(path, st, compiled.file_digest(path), forms, [0, 11])
+        with self.assertRaises(MalException) as cm:
+            self.rep('(load-file "loaded.mal")')
+        self.assertEqual("2", self.rep("x"))
+        self.assertIn("loaded.mal:2:1: (throw x)", cm.exception.readable_backtrace())
+
+    def test_restricted(self):
+        env = rep.init_repl_env(restricted=True)
+        with self.assertRaises(MalUnknownSymbolException):
+            rep.rep('(require "counter.mal")', env)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from lispy import rep
+from lispy.mal_types import MalInvalidArgumentException
+
+
+class TestSort(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_compare(self):
+        self.assertEqual("-1", self.rep("(compare 1 2.5)"))
+        self.assertEqual("1", self.rep('(compare "b" "a")'))
+        self.assertEqual("0", self.rep("(compare [1 2] '(1 2))"))
+        self.assertEqual("-1", self.rep("(compare [9] [1 2])"))
+        self.assertEqual("-1", self.rep("(compare nil :a)"))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(compare 1 "a")')
+
+    def test_sort(self):
+        self.assertEqual("(1 2 3)", self.rep("(sort [3 1 2])"))
+        self.assertEqual('("a" "b" "c")', self.rep('(sort \'("c" "a" "b"))'))
+        self.assertEqual("(nil :a :b)", self.rep("(sort [:b nil :a])"))
+        self.assertEqual(
+            "(:b :a nil)", self.rep("(sort (fn* (a b) (compare b a)) [:a nil :b])")
+        )
+        self.assertEqual("(3 2 1)", self.rep("(sort > [1 3 2])"))
+        self.assertEqual("([1] [0 0] [1 2])", self.rep("(sort [[1 2] [1] [0 0]])"))
+        self.assertEqual("()", self.rep("(sort nil)"))
+
+    def test_sort_by(self):
+        self.rep("(def! calls (atom 0))")
+        self.rep("(def! key (fn* (m) (do (swap! calls + 1) (get m :n))))")
+        self.assertEqual(
+            "({:n 1} {:n 2} {:n 3})", self.rep("(sort-by key [{:n 3} {:n 1} {:n 2}])")
+        )
+        self.assertEqual("3", self.rep("@calls"))
+        self.assertEqual(
+            "([1 1 1] [1 1] [1])", self.rep("(sort-by count > [[1 1] [1] [1 1 1]])")
+        )
+
+    def test_sort_stable(self):
+        self.assertEqual(
+            "([1 :b] [1 :a] [2 :c])",
+            self.rep("(sort-by first [[2 :c] [1 :b] [1 :a]])"),
+        )
+
+    def test_group_by(self):
+        self.rep('(def! parity (fn* (n) (if (= n (* 2 (/ n 2))) "even" "odd")))')
+        self.assertEqual(
+            '{"odd" [1 3] "even" [2]}', self.rep("(group-by parity [1 2 3])")
+        )
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep("(group-by count [[1] [2]])")
+
+    def test_frequencies(self):
+        self.assertEqual("{:a 2 :b 1}", self.rep("(frequencies [:a :b :a])"))
+
+    def test_distinct(self):
+        self.assertEqual("(1 [2] 3)", self.rep("(distinct [1 [2] 1 '(2) 3])"))
+
+    def test_partition(self):
+        self.assertEqual("((1 2) (3 4))", self.rep("(partition 2 [1 2 3 4 5])"))
+        self.assertEqual("((1 2) (2 3) (3 4))", self.rep("(partition 2 1 [1 2 3 4])"))
+        self.assertEqual(
+            "((1 2 3) (4 5 :x))", self.rep("(partition 3 3 [:x :y] [1 2 3 4 5])")
+        )
+
+    def test_partition_by(self):
+        self.assertEqual(
+            "((1 1) (2) (1))", self.rep("(partition-by (fn* (x) (= x 1)) [1 1 2 1])"),
+        )
+        self.assertEqual("()", self.rep("(partition-by list [])"))
+
+
+if __name__ == "__main__":
+    unittest.main()
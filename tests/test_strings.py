@@ -0,0 +1,71 @@
+import unittest
+
+from lispy import rep
+from lispy.mal_types import MalIndexError, MalInvalidArgumentException
+
+
+class TestStrings(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repl_env = rep.init_repl_env()
+
+    def rep(self, input: str) -> str:
+        return rep.rep(input, self._repl_env)
+
+    def test_subs(self):
+        self.assertEqual('"ell"', self.rep('(subs "hello" 1 4)'))
+        self.assertEqual('"llo"', self.rep('(subs "hello" 2)'))
+        with self.assertRaises(MalIndexError):
+            self.rep('(subs "hello" 2 9)')
+
+    def test_join(self):
+        self.assertEqual('"a, 1, :b"', self.rep('(join ", " ["a" 1 :b])'))
+        self.assertEqual('"ab"', self.rep('(join \'("a" "b"))'))
+
+    def test_split(self):
+        self.assertEqual('["a" "b" "c"]', self.rep('(split "a,b,c" ",")'))
+        self.assertEqual('["a" "b,c"]', self.rep('(split "a,b,c" "," 2)'))
+        self.assertEqual(
+            '["a" "b" "c"]', self.rep('(split "a1b22c333" (re-pattern "\\\\d+"))')
+        )
+        self.assertEqual('["a,b"]', self.rep('(split "a,b" (re-pattern ",") 1)'))
+        self.assertEqual('["a" "b,c"]', self.rep('(split "a,b,c" (re-pattern ",") 2)'))
+        self.assertEqual('["a,b"]', self.rep('(split "a,b" "," 1)'))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(split "abc" "")')
+
+    def test_case_and_trim(self):
+        self.assertEqual('"ABC"', self.rep('(upper-case "abc")'))
+        self.assertEqual('"abc"', self.rep('(lower-case "ABC")'))
+        self.assertEqual('"abc"', self.rep('(trim "  abc\\n")'))
+
+    def test_predicates(self):
+        self.assertEqual("true", self.rep('(starts-with? "hello" "he")'))
+        self.assertEqual("false", self.rep('(ends-with? "hello" "he")'))
+        self.assertEqual("true", self.rep('(includes? "hello" "ll")'))
+
+    def test_replace(self):
+        self.assertEqual('"he77o"', self.rep('(replace "hello" "l" "7")'))
+        self.assertEqual(
+            '"2020/01"',
+            self.rep('(replace "01-2020" (re-pattern "(\\\\d+)-(\\\\d+)") "$2/$1")'),
+        )
+        self.assertEqual(
+            '"A-B"', self.rep('(replace "a-b" (re-pattern "[a-z]") upper-case)')
+        )
+
+    def test_regex(self):
+        self.assertEqual('#"\\d+"', self.rep('(re-pattern "\\\\d+")'))
+        self.assertEqual(
+            '"123"', self.rep('(re-find (re-pattern "\\\\d+") "ab123cd45")')
+        )
+        self.assertEqual(
+            '["k=v" "k" "v"]', self.rep('(re-matches "(\\\\w+)=(\\\\w+)" "k=v")')
+        )
+        self.assertEqual("nil", self.rep('(re-matches "\\\\d+" "12a")'))
+        self.assertEqual('("12" "3")', self.rep('(re-seq "\\\\d+" "a12b3")'))
+        with self.assertRaises(MalInvalidArgumentException):
+            self.rep('(re-pattern "(")')
+
+
+if __name__ == "__main__":
+    unittest.main()